@@ -27,7 +27,9 @@ import numpy as np
 import sys
 sys.path.append('../')
 from mesh.cartesian_mesh import cartesian_mesh_t
+from fields import field_expression
 from tools.combination_index import combination_index # check if actually needed
+from tools.axis_slice import axis_slice
 
 # --------------------------------------------------------------------------- #
 # Class definition
@@ -40,32 +42,50 @@ class field_t:
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Constructor for a field over mesh elements (cells, faces, edges or corners)
     #                         n = num_directions (n = 0, n = 1, n = 2 or n = 3  )
-    def __init__(self, mesh, init_values=0.0, num_directions=0, orientation=0):
+    def __init__(self, mesh, init_values=0.0, num_directions=0, orientation=0, dtype=None, \
+                 halo_width=None, boundary_conditions=None):
 
         # Assigns the mesh to the field
         self.mesh = mesh
 
+        # Assigns the boundary conditions (the mesh ones if None)
+        self.boundary_conditions = boundary_conditions
+
         # Assigns the position of the field in the mesh
         self.num_directions = num_directions
         self.orientation    = orientation
 
-        # Assigns total number of values in the field
+        # Assigns total number of values in the field and its structured shape
         self.tot_points = self.mesh.tot_points[num_directions][orientation]
+        self.shape      = tuple(self.mesh.num_points[num_directions][orientation])
+
+        # Floating point type of the values (the mesh one by default)
+        value_dtype = self.mesh.dtype if dtype is None else np.dtype(dtype)
 
         # Initializes the field
         if callable(init_values):
-            # If the initial condition is a function or method, pass to it the mesh coordinates
-            coords_temp = self.mesh.cell_coord_arrays[num_directions][orientation]
-            self.values = init_values(tuple(coords_temp))
-
-        elif type(init_values) == int or type(init_values) == float:
+            # If the initial condition is a function or method, pass to it the mesh
+            # coordinates as zero-stride views of the structured layout, then
+            # flatten the result in the global index order
+            coords_temp = self.mesh.grid_coords(num_directions, orientation)
+            values_temp = np.asarray(init_values(tuple(coords_temp)))
+            if values_temp.shape != self.shape:
+                values_temp = np.broadcast_to(values_temp, self.shape)
+            self.values = np.ravel(values_temp, order=self.mesh.array_order())
+            if not self.values.flags.writeable or self.values.dtype != value_dtype:
+                self.values = self.values.astype(value_dtype)
+
+        elif isinstance(init_values, (int, float, np.number)):
             # If the initial condition is a constant value, assign it to the array
-            self.values = np.ones(self.tot_points, dtype=np.float64) * init_values
+            self.values = np.full(self.tot_points, init_values, dtype=value_dtype)
 
         elif type(init_values)==np.ndarray:
             # If the initial condiiton is already a numpy array, check its shape and assign it
+            # (converting it only if a different dtype is requested)
             if len(np.shape(init_values)) == 1 and np.size(init_values, 0) == self.tot_points:
                 self.values = init_values
+                if dtype is not None and self.values.dtype != value_dtype:
+                    self.values = self.values.astype(value_dtype)
             else:
                 self.values = None
                 print("ERROR: inconsistent field shape (", np.shape(init_values), \
@@ -76,19 +96,176 @@ class field_t:
             self.values = None
             print("ERROR: invald initial condition: type = ", type(init_values))
 
+        # Allocates the ghost layers (the mesh number of layers by default)
+        self.allocate_halo(self.mesh.halo_width if halo_width is None else halo_width)
+
+    # ----------------------------------------------------------------------- #
+    # Ghost layers
+    #   Without ghost layers the values are a flat array holding the points of
+    #   the mesh. With halo_width ghost layers the field is stored in a single
+    #   array, padded, extending the structured layout by halo_width layers
+    #   beyond each boundary, and the values are the strided N-dimensional view
+    #   of its interior (flat access by integers and slices, other than the
+    #   full slice, is then not available). Along each axis the ghost layers
+    #   are the slabs of padded facing the interior (the corners of the padding
+    #   are not used).
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Allocates the ghost layers, moving the values into the padded array
+    def allocate_halo(self, halo_width):
+        self.halo_width = halo_width
+        self.padded     = None
+        if halo_width > 0 and self.values is not None:
+            shape = [n + 2 * halo_width for n in self.shape]
+            padded = np.zeros(shape, dtype=self.values.dtype, order=self.mesh.array_order())
+            padded[self.interior_slice()] = self.view
+            self.padded = padded
+            self.values = padded[self.interior_slice()]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Index of the interior (the points of the mesh) in the padded array
+    def interior_slice(self):
+        h = self.halo_width
+        return tuple(slice(h, n + h) for n in self.shape)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # View of the padded array over the layers start <= k < stop along axis
+    # (numbered as the points, ghost layers beyond the range) and the interior
+    # along the other axes, so that stencils are slices of the padded array
+    def padded_slice(self, axis, start, stop):
+        h = self.halo_width
+        index = list(self.interior_slice())
+        index[axis] = slice(start + h, stop + h)
+        return self.padded[tuple(index)]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Ghost layers beyond the lower (side 0) or upper (side 1) boundary of axis
+    # (a view of the padded array, ordered along the axis: the last lower layer
+    # and the first upper one touch the boundary)
+    def halo_slab(self, axis, side):
+        h = self.halo_width
+        n = self.shape[axis]
+        return self.padded_slice(axis, -h, 0) if side == 0 else self.padded_slice(axis, n, n + h)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Boundary conditions of the field (its own, or the mesh ones)
+    def get_boundary_conditions(self):
+        if self.boundary_conditions is None:
+            return self.mesh.boundary_conditions
+        return self.boundary_conditions
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Applies the boundary conditions, only touching boundary slabs: sets the
+    # Dirichlet boundary nodes and fills the ghost layers (if any)
+    def apply_boundary_conditions(self):
+        return self.get_boundary_conditions().apply(self)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Fills the ghost layers from the boundary conditions
+    def fill_halo(self):
+        return self.apply_boundary_conditions()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the ghost layers touching the lower and upper boundary of axis
+    # (one layer thick): layers of the padded array if the field has ghost
+    # layers (as last filled), otherwise computed from the boundary conditions
+    # (periodic layers are views of the field, the others the mesh ghost
+    # buffers, valid until the next call at the same location)
+    def ghost_layers(self, axis):
+        if self.padded is not None:
+            n = self.shape[axis]
+            return (self.padded_slice(axis, -1, 0), self.padded_slice(axis, n, n + 1))
+        bcs = self.get_boundary_conditions()
+        layers = [None, None]
+        for side in range(2):
+            out = None
+            if bcs.conditions[axis][side].kind != "periodic":
+                out = self.mesh.ghost_buffer(axis, side, self.num_directions, self.orientation, self.dtype)
+            layers[side] = bcs.ghost_slab(self, axis, side, 1, out)
+        return tuple(layers)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Interior points (the structured view, a strided view of the padded array
+    # for fields with ghost layers)
+    @property
+    def interior(self):
+        return self.view
+
+    # ----------------------------------------------------------------------- #
+    # Structured access
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Floating point type of the values
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # N-dimensional view of the values (no copy), laid out as in global_index
+    @property
+    def view(self):
+        if self.padded is not None:
+            return self.values
+        return self.values.reshape(self.shape, order=self.mesh.array_order())
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Values as a flat array in global index order (a copy for fields with
+    # ghost layers)
+    def flat_values(self):
+        if self.padded is not None:
+            return np.ravel(self.values, order=self.mesh.array_order())
+        return self.values
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Whether fields (also within lists, tuples and dictionaries) have ghost
+    # layers, so that operations must go through the structured views
+    @staticmethod
+    def has_halo(obj):
+        if isinstance(obj, field_t):
+            return obj.padded is not None
+        elif isinstance(obj, (list, tuple)):
+            return any(field_t.has_halo(x) for x in obj)
+        elif isinstance(obj, dict):
+            return any(field_t.has_halo(x) for x in obj.values())
+        return False
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Converts an index of the flat values into an index of the structured view
+    # (None, with an error, if there is none)
+    def structured_key(self, key):
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += self.tot_points
+            return self.mesh.local_index(key, self.num_directions, self.orientation)
+        elif isinstance(key, slice):
+            if key == slice(None):
+                return Ellipsis
+            print("ERROR: flat slices of a field with ghost layers: ", key)
+            return None
+        return key
+
     # ----------------------------------------------------------------------- #
     # Overload indexing ("[]") operator
-    
+    #   - integers and slices index the flat values
+    #   - tuples of integers are converted with global_index
+    #   - any other tuple (slices, ellipsis, arrays) indexes the structured view
+    #   - with ghost layers, integers are converted with local_index and only
+    #     the full slice is accepted
+
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload get item operator
     def __getitem__(self, key):
-        if isinstance(key, slice):
-            print("Slicing not implemented yet")
-            return None
-        if type(key)==int:
+        if self.padded is not None:
+            key = self.structured_key(key)
+            return None if key is None else self.view[key]
+        if isinstance(key, (int, np.integer, slice)):
             return self.values[key]
         elif type(key) == tuple:
-            return self.values[self.mesh.global_index(key, self.num_directions, self.orientation)]
+            if all(isinstance(k, (int, np.integer)) for k in key):
+                return self.values[self.mesh.global_index(key, self.num_directions, self.orientation)]
+            return self.view[key]
+        elif key is Ellipsis:
+            return self.view
         else:
             print("Unrecognised index type: ", type(key))
             return None
@@ -96,229 +273,232 @@ class field_t:
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload set item operator
     def __setitem__(self, key, value):
-        if isinstance(key, slice):
-            print("Slicing not implemented yet")
-            return None
-        if type(key)==int:
+        if isinstance(value, field_expression.expression_t):
+            if key is Ellipsis or (isinstance(key, slice) and key == slice(None)):
+                value.eval(self)
+                return
+            value = value.eval()
+        if self.padded is not None:
+            key = self.structured_key(key)
+            if key is None:
+                return
+            if isinstance(value, field_t):
+                value = value.view
+            elif isinstance(value, np.ndarray) and value.shape == (self.tot_points,):
+                value = value.reshape(self.shape, order=self.mesh.array_order())
+            self.view[key] = value
+            return
+        if isinstance(value, field_t):
+            value = value.flat_values() if isinstance(key, slice) else value.view
+        if isinstance(key, (int, np.integer, slice)):
             self.values[key] = value
         elif type(key) == tuple:
-            self.values[self.mesh.global_index(key, self.num_directions, self.orientation)] = value
+            if all(isinstance(k, (int, np.integer)) for k in key):
+                self.values[self.mesh.global_index(key, self.num_directions, self.orientation)] = value
+            else:
+                self.view[key] = value
+        elif key is Ellipsis:
+            self.view[...] = value
         else:
             print("Unrecognised index type: ", type(key))
 
-
     # ----------------------------------------------------------------------- #
-    # Overload binary operators
+    # Result construction and operand handling
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Wraps an array into a new field (without ghost layers) at the same
+    # location, without copying nor validating it (the array must hold the
+    # values, flat or structured as the view of a contiguous array)
+    def wrap(self, values):
+        if values is not None and values.ndim > 1:
+            values = np.ravel(values, order=self.mesh.array_order())
+        new_obj = field_t.__new__(field_t)
+        new_obj.mesh           = self.mesh
+        new_obj.num_directions = self.num_directions
+        new_obj.orientation    = self.orientation
+        new_obj.tot_points     = self.tot_points
+        new_obj.shape          = self.shape
+        new_obj.values         = values
+        new_obj.halo_width     = 0
+        new_obj.padded         = None
+        new_obj.boundary_conditions = self.boundary_conditions
+        return new_obj
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the field as a (leaf) deferred expression
+    def lazy(self):
+        return field_expression.expression_t(self, values = self.flat_values())
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Create copy of the current object and return it
     def create_copy(self):
-        copy_obj = field_t(self.mesh, self.values, self.num_directions, self.orientation)
+        if self.padded is None:
+            return self.wrap(self.values.copy())
+        copy_obj = self.wrap(None)
+        copy_obj.halo_width = self.halo_width
+        copy_obj.padded = self.padded.copy()
+        copy_obj.values = copy_obj.padded[self.interior_slice()]
         return copy_obj
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
-    # Overload addition operator
-    def __add__(self, other):
-        copy_obj = self.create_copy()
-        if type(other) == int:
-            copy_obj.values = self.values + float(other)
-        elif type(other) == float:
-            copy_obj.values = self.values + other
-        elif type(other) == np.ndarray:
-            if len(np.shape(other)) == 1 and np.size(other, 0) == self.tot_points:
-                copy_obj.values = self.values + other
-            else:
-                print("ERROR: inconsistent field shape (", np.shape(other), " vs. (", \
-                      self.mesh.tot_points[self.num_directions][self.orientation], ",))")
-                copy_obj = None                   
-        elif type(other) == field_t:
+    # Checks an operand and returns its values, flat or structured (None if it
+    # is not valid)
+    def operand_values(self, other, structured = False):
+        if isinstance(other, field_t):
             if other.tot_points == self.tot_points:
-                copy_obj.values = self.values + other.values
-            else:
-                print("ERROR: inconsistent field size (", other.tot_points," vs. ", self.tot_points, ")")
-                copy_obj = None
+                return other.view if structured else other.values
+            print("ERROR: inconsistent field size (", other.tot_points," vs. ", self.tot_points, ")")
+        elif isinstance(other, (int, float, np.number)):
+            # NumPy scalars behave as Python ones, preserving the field precision
+            return other.item() if isinstance(other, np.generic) else other
+        elif isinstance(other, np.ndarray):
+            if other.ndim == 1 and other.shape[0] == self.tot_points:
+                return other.reshape(self.shape, order=self.mesh.array_order()) if structured else other
+            print("ERROR: inconsistent field shape (", np.shape(other), " vs. (", \
+                  self.tot_points, ",))")
         else:
             print("ERROR: unknown operand type: ", type(other))
-            copy_obj = None
-        return copy_obj
+        return None
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Applies a NumPy ufunc and wraps the result (None on error)
+    def binary_op(self, ufunc, other, reflected = False):
+        if field_expression.deferred_evaluation or \
+           isinstance(other, field_expression.expression_t):
+            if reflected:
+                return field_expression.expression_t.build(ufunc, other, self)
+            return field_expression.expression_t.build(ufunc, self, other)
+        structured = self.padded is not None or field_t.has_halo(other)
+        other_values = self.operand_values(other, structured)
+        if other_values is None:
+            return None
+        values = self.view if structured else self.values
+        if reflected:
+            return self.wrap(ufunc(other_values, values))
+        return self.wrap(ufunc(values, other_values))
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Wraps results having the shape of the values (flat, or structured), returns
+    # the others as they are
+    def wrap_result(self, result, structured = False):
+        shape = self.shape if structured else (self.tot_points,)
+        if isinstance(result, np.ndarray) and result.shape == shape:
+            return self.wrap(result)
+        return result
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Replaces fields (also within lists, tuples and dictionaries) by their
+    # values, flat or structured
+    @staticmethod
+    def unwrap(obj, structured = False):
+        if isinstance(obj, field_t):
+            return obj.view if structured else obj.values
+        elif isinstance(obj, (list, tuple)):
+            return type(obj)(field_t.unwrap(x, structured) for x in obj)
+        elif isinstance(obj, dict):
+            return {key: field_t.unwrap(x, structured) for (key, x) in obj.items()}
+        return obj
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # NumPy array conversion (no copy)
+    def __array__(self, dtype = None, copy = None):
+        if dtype is None and not copy:
+            return self.values
+        return np.array(self.values, dtype=dtype, copy=True)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # NumPy ufunc protocol: field operands and outputs are replaced by their
+    # values (their structured views if any field has ghost layers), so that
+    # e.g. np.add(a, b, out=c) writes directly into c
+    #   - __call__ (and accumulate) results are wrapped into fields
+    #   - reductions return NumPy scalars or arrays
+    def __array_ufunc__(self, ufunc, method, *inputs, out = None, **kwargs):
+        if any(isinstance(x, field_expression.expression_t) for x in inputs):
+            return NotImplemented
+        structured = field_t.has_halo(inputs) or field_t.has_halo(out)
+        args = [None] * len(inputs)
+        for i in range(len(inputs)):
+            if method == "__call__":
+                args[i] = self.operand_values(inputs[i], structured)
+                if args[i] is None:
+                    return None
+            else:
+                args[i] = field_t.unwrap(inputs[i], structured)
+        if out is not None:
+            kwargs["out"] = field_t.unwrap(out, structured)
+        results = getattr(ufunc, method)(*args, **kwargs)
+        if out is not None:
+            return out[0] if len(out) == 1 else out
+        if method == "__call__" and ufunc.nout > 1:
+            return tuple(self.wrap_result(result, structured) for result in results)
+        return self.wrap_result(results, structured)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # NumPy function protocol: functions run on the values (the structured
+    # views if any field has ghost layers); array results with the shape of
+    # the values are wrapped into fields at the same location
+    def __array_function__(self, func, types, args, kwargs):
+        if not all(issubclass(t, (field_t, np.ndarray)) for t in types):
+            return NotImplemented
+        structured = field_t.has_halo(args) or field_t.has_halo(kwargs)
+        result = func(*field_t.unwrap(args, structured), **field_t.unwrap(kwargs, structured))
+        if isinstance(kwargs.get("out"), field_t):
+            return kwargs["out"]
+        if isinstance(result, tuple):
+            return tuple(self.wrap_result(x, structured) for x in result)
+        return self.wrap_result(result, structured)
+
+    # ----------------------------------------------------------------------- #
+    # Overload binary operators
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload addition operator
+    def __add__(self, other):
+        return self.binary_op(np.add, other)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload subtraction operator
     def __sub__(self, other):
-        copy_obj = self.create_copy()
-        if type(other) == int:
-            copy_obj.values = self.values - float(other)
-        elif type(other) == float:
-            copy_obj.values = self.values - other
-        elif type(other) == np.ndarray:
-            if len(np.shape(other)) == 1 and np.size(other, 0) == self.tot_points:
-                copy_obj.values = self.values - other
-            else:
-                print("ERROR: inconsistent field shape (", np.shape(other), " vs. (", \
-                      self.mesh.tot_points[self.num_directions][self.orientation], ",))")
-                copy_obj = None                   
-        elif type(other) == field_t:
-            if other.tot_points == self.tot_points:
-                copy_obj.values = self.values - other.values
-            else:
-                print("ERROR: inconsistent field size (", other.tot_points," vs. ", self.tot_points, ")")
-                copy_obj = None
-        else:
-            print("ERROR: unknown operand type: ", type(other))
-            copy_obj = None
-        return copy_obj
+        return self.binary_op(np.subtract, other)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload multiplication operator
     def __mul__(self, other):
-        copy_obj = self.create_copy()
-        if type(other) == int:
-            copy_obj.values = self.values * float(other)
-        elif type(other) == float:
-            copy_obj.values = self.values * other
-        elif type(other) == np.ndarray:
-            if len(np.shape(other)) == 1 and np.size(other, 0) == self.tot_points:
-                copy_obj.values = self.values * other
-            else:
-                print("ERROR: inconsistent field shape (", np.shape(other), " vs. (", \
-                      self.mesh.tot_points[self.num_directions][self.orientation], ",))")
-                copy_obj = None                   
-        elif type(other) == field_t:
-            if other.tot_points == self.tot_points:
-                copy_obj.values = self.values * other.values
-            else:
-                print("ERROR: inconsistent field size (", other.tot_points," vs. ", self.tot_points, ")")
-                copy_obj = None
-        else:
-            print("ERROR: unknown operand type: ", type(other))
-            copy_obj = None
-        return copy_obj
+        return self.binary_op(np.multiply, other)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload matmul ("@") operator to perform dot multiplication
     def __matmul__(self, other):
-        result
-        if type(other) == np.ndarray:
-            if len(np.shape(other)) == 1 and np.size(other, 0) == self.tot_points:
-                result = self.values @ other
-            else:
-                print("ERROR: inconsistent field shape (", np.shape(other), " vs. (", \
-                      self.mesh.tot_points[self.num_directions][self.orientation], ",))")
-                result = None                   
-        elif type(other) == field_t:
-            if other.tot_points == self.tot_points:
-                result = self.values @ other.values
-            else:
-                print("ERROR: inconsistent field size (", other.tot_points," vs. ", self.tot_points, ")")
-                result = None
-        else:
+        if isinstance(other, (int, float, np.number)):
             print("ERROR: unknown operand type: ", type(other))
-            result = None
-        return result
+            return None
+        structured = self.padded is not None or field_t.has_halo(other)
+        other_values = self.operand_values(other, structured)
+        if other_values is None:
+            return None
+        if structured:
+            return np.vdot(self.view, other_values)
+        return self.values @ other_values
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload truediv ("/") operator
     def __truediv__(self, other):
-        copy_obj = self.create_copy()
-        if type(other) == int:
-            copy_obj.values = self.values / float(other)
-        elif type(other) == float:
-            copy_obj.values = self.values / other
-        elif type(other) == np.ndarray:
-            if len(np.shape(other)) == 1 and np.size(other, 0) == self.tot_points:
-                copy_obj.values = self.values / other
-            else:
-                print("ERROR: inconsistent field shape (", np.shape(other), " vs. (", \
-                      self.mesh.tot_points[self.num_directions][self.orientation], ",))")
-                copy_obj = None                   
-        elif type(other) == field_t:
-            if other.tot_points == self.tot_points:
-                copy_obj.values = self.values / other.values
-            else:
-                print("ERROR: inconsistent field size (", other.tot_points," vs. ", self.tot_points, ")")
-                copy_obj = None
-        else:
-            print("ERROR: unknown operand type: ", type(other))
-            copy_obj = None
-        return copy_obj
+        return self.binary_op(np.true_divide, other)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload floordiv ("//") operator
     def __floordiv__(self, other):
-        copy_obj = self.create_copy()
-        if type(other) == int:
-            copy_obj.values = self.values // float(other)
-        elif type(other) == float:
-            copy_obj.values = self.values // other
-        elif type(other) == np.ndarray:
-            if len(np.shape(other)) == 1 and np.size(other, 0) == self.tot_points:
-                copy_obj.values = self.values // other
-            else:
-                print("ERROR: inconsistent field shape (", np.shape(other), " vs. (", \
-                      self.mesh.tot_points[self.num_directions][self.orientation], ",))")
-                copy_obj = None                   
-        elif type(other) == field_t:
-            if other.tot_points == self.tot_points:
-                copy_obj.values = self.values // other.values
-            else:
-                print("ERROR: inconsistent field size (", other.tot_points," vs. ", self.tot_points, ")")
-                copy_obj = None
-        else:
-            print("ERROR: unknown operand type: ", type(other))
-            copy_obj = None
-        return copy_obj
+        return self.binary_op(np.floor_divide, other)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload mod ("%") operator
     def __mod__(self, other):
-        copy_obj = self.create_copy()
-        if type(other) == int:
-            copy_obj.values = self.values % float(other)
-        elif type(other) == float:
-            copy_obj.values = self.values % other
-        elif type(other) == np.ndarray:
-            if len(np.shape(other)) == 1 and np.size(other, 0) == self.tot_points:
-                copy_obj.values = self.values % other
-            else:
-                print("ERROR: inconsistent field shape (", np.shape(other), " vs. (", \
-                      self.mesh.tot_points[self.num_directions][self.orientation], ",))")
-                copy_obj = None                   
-        elif type(other) == field_t:
-            if other.tot_points == self.tot_points:
-                copy_obj.values = self.values % other.values
-            else:
-                print("ERROR: inconsistent field size (", other.tot_points," vs. ", self.tot_points, ")")
-                copy_obj = None
-        else:
-            print("ERROR: unknown operand type: ", type(other))
-            copy_obj = None
-        return copy_obj
+        return self.binary_op(np.mod, other)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload pow ("**") operator
     def __pow__(self, other):
-        copy_obj = self.create_copy()
-        if type(other) == int:
-            copy_obj.values = self.values ** other
-        elif type(other) == float:
-            copy_obj.values = self.values ** other
-        elif type(other) == np.ndarray:
-            if len(np.shape(other)) == 1 and np.size(other, 0) == self.tot_points:
-                copy_obj.values = self.values ** other
-            else:
-                print("ERROR: inconsistent field shape (", np.shape(other), " vs. (", \
-                      self.mesh.tot_points[self.num_directions][self.orientation], ",))")
-                copy_obj = None                   
-        elif type(other) == field_t:
-            if other.tot_points == self.tot_points:
-                copy_obj.values = self.values ** other.values
-            else:
-                print("ERROR: inconsistent field size (", other.tot_points," vs. ", self.tot_points, ")")
-                copy_obj = None
-        else:
-            print("ERROR: unknown operand type: ", type(other))
-            copy_obj = None
-        return copy_obj
+        return self.binary_op(np.power, other)
 
     # ----------------------------------------------------------------------- #
     # Overload binary operators (inverted operand versions)
@@ -326,38 +506,17 @@ class field_t:
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload addition operator
     def __radd__(self, other):
-        return self.__add__(other)
+        return self.binary_op(np.add, other, True)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload subtraction operator
     def __rsub__(self, other):
-        copy_obj = self.create_copy()
-        if type(other) == int:
-            copy_obj.values = float(other) - self.values
-        elif type(other) == float:
-            copy_obj.values = other - self.values
-        elif type(other) == np.ndarray:
-            if len(np.shape(other)) == 1 and np.size(other, 0) == self.tot_points:
-                copy_obj.values = other - self.values
-            else:
-                print("ERROR: inconsistent field shape (", np.shape(other), " vs. (", \
-                      self.mesh.tot_points[self.num_directions][self.orientation], ",))")
-                copy_obj = None                   
-        elif type(other) == field_t:
-            if other.tot_points == self.tot_points:
-                copy_obj.values = other.values - self.values
-            else:
-                print("ERROR: inconsistent field size (", other.tot_points," vs. ", self.tot_points, ")")
-                copy_obj = None
-        else:
-            print("ERROR: unknown operand type: ", type(other))
-            copy_obj = None
-        return copy_obj
+        return self.binary_op(np.subtract, other, True)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload multiplication operator
     def __rmul__(self, other):
-        return self.__mul__(other)
+        return self.binary_op(np.multiply, other, True)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload matmul ("@") operator to perform dot multiplication
@@ -367,78 +526,91 @@ class field_t:
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload truediv ("/") operator
     def __rtruediv__(self, other):
-        return None
+        return self.binary_op(np.true_divide, other, True)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload floordiv ("//") operator
     def __rfloordiv__(self, other):
-        return None
+        return self.binary_op(np.floor_divide, other, True)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload mod ("%") operator
     def __rmod__(self, other):
-        return None
+        return self.binary_op(np.mod, other, True)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload pow ("**") operator
     def __rpow__(self, other):
-        copy_obj = self.create_copy()
-        if type(other) == int:
-            copy_obj.values = float(other) ** self.values
-        elif type(other) == float:
-            copy_obj.values = other ** self.values
-        elif type(other) == np.ndarray:
-            if len(np.shape(other)) == 1 and np.size(other, 0) == self.tot_points:
-                copy_obj.values = other ** self.values
-            else:
-                print("ERROR: inconsistent field shape (", np.shape(other), " vs. (", \
-                      self.mesh.tot_points[self.num_directions][self.orientation], ",))")
-                copy_obj = None                   
-        elif type(other) == field_t:
-            if other.tot_points == self.tot_points:
-                copy_obj.values = other.values ** self.values
-            else:
-                print("ERROR: inconsistent field size (", other.tot_points," vs. ", self.tot_points, ")")
-                copy_obj = None
-        else:
-            print("ERROR: unknown operand type: ", type(other))
-            copy_obj = None
-        return copy_obj
+        return self.binary_op(np.power, other, True)
 
     # ----------------------------------------------------------------------- #
     # Overload unary operators
 
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload negation operator
+    def __neg__(self):
+        return self.wrap(np.negative(self.values))
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload identity operator
+    def __pos__(self):
+        return self.create_copy()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload absolute value operator
+    def __abs__(self):
+        return self.wrap(np.absolute(self.values))
+
+    # ----------------------------------------------------------------------- #
+    # Overload in-place operators
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Applies a NumPy ufunc in place on the values (left unchanged on error)
+    def inplace_op(self, ufunc, other):
+        if isinstance(other, field_expression.expression_t):
+            # Fuses the update with the evaluation of the expression
+            node = field_expression.expression_t.build(ufunc, self, other)
+            if node is not None:
+                node.eval(self)
+            return self
+        structured = self.padded is not None or field_t.has_halo(other)
+        other_values = self.operand_values(other, structured)
+        if other_values is not None:
+            values = self.view if structured else self.values
+            ufunc(values, other_values, out=values)
+        return self
+
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload addition operator
     def __iadd__(self, other):
-        pass
+        return self.inplace_op(np.add, other)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload subtraction operator
     def __isub__(self, other):
-        pass
+        return self.inplace_op(np.subtract, other)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload multiplication operator
     def __imul__(self, other):
-        pass
+        return self.inplace_op(np.multiply, other)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload truediv ("/") operator
     def __itruediv__(self, other):
-        pass
+        return self.inplace_op(np.true_divide, other)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload floordiv ("//") operator
     def __ifloordiv__(self, other):
-        pass
+        return self.inplace_op(np.floor_divide, other)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload mod ("%") operator
     def __imod__(self, other):
-        pass
+        return self.inplace_op(np.mod, other)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Overload pow ("**") operator
     def __ipow__(self, other):
-        pass
\ No newline at end of file
+        return self.inplace_op(np.power, other)
@@ -0,0 +1,275 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+from contextlib import contextmanager
+
+# If True, field_t operators build expressions instead of computing arrays
+deferred_evaluation = False
+
+# Number of values evaluated at once (chosen to keep temporaries in cache)
+chunk_size = 16384
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Context manager enabling deferred evaluation of field_t operators
+@contextmanager
+def deferred():
+    global deferred_evaluation
+    previous = deferred_evaluation
+    deferred_evaluation = True
+    try:
+        yield
+    finally:
+        deferred_evaluation = previous
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class expression_t:
+    """An elementwise expression over fields, evaluated in a single chunked pass."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor
+    #   - leaf: values is the flat array of a field (or a 1D array)
+    #   - node: ufunc applied to operands (expressions or scalars)
+    def __init__(self, template, values = None, ufunc = None, operands = ()):
+
+        # Field providing the location of the result
+        self.template = template
+
+        # Leaf values, or ufunc and operands of a node
+        self.values   = values
+        self.ufunc    = ufunc
+        self.operands = list(operands)
+
+        # Chunk buffer, allocated on first evaluation
+        self.buffer   = None
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Builds a node applying ufunc to the given operands (None on error)
+    @staticmethod
+    def build(ufunc, *operands):
+        template = None
+        for operand in operands:
+            if isinstance(operand, expression_t):
+                template = operand.template
+            elif hasattr(operand, "tot_points"):
+                template = operand
+            if template is not None:
+                break
+        nodes = [None] * len(operands)
+        for i in range(len(operands)):
+            nodes[i] = expression_t.operand(template, operands[i])
+            if nodes[i] is None:
+                return None
+        return expression_t(template, ufunc = ufunc, operands = nodes)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Converts an operand into an expression or scalar (None if not valid)
+    @staticmethod
+    def operand(template, other):
+        if isinstance(other, expression_t):
+            size = other.template.tot_points
+        elif isinstance(other, (int, float, np.number)):
+            return other.item() if isinstance(other, np.generic) else other
+        elif hasattr(other, "tot_points"):
+            size  = other.tot_points
+            other = expression_t(other, values = other.flat_values())
+        elif isinstance(other, np.ndarray) and other.ndim == 1:
+            size  = other.shape[0]
+            other = expression_t(template, values = other)
+        else:
+            print("ERROR: unknown operand type: ", type(other))
+            return None
+        if size != template.tot_points:
+            print("ERROR: inconsistent field size (", size," vs. ", template.tot_points, ")")
+            return None
+        return other
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Evaluates the values in [start, stop) (into out, if given)
+    def evaluate(self, start, stop, out = None):
+        if self.ufunc is None:
+            if out is None:
+                return self.values[start:stop]
+            out[...] = self.values[start:stop]
+            return out
+        args = [None] * len(self.operands)
+        for i in range(len(self.operands)):
+            if isinstance(self.operands[i], expression_t):
+                args[i] = self.operands[i].evaluate(start, stop)
+            else:
+                args[i] = self.operands[i]
+        if out is None:
+            if self.buffer is None or self.buffer.shape[0] < stop - start:
+                result = self.ufunc(*args)
+                self.buffer = np.empty(chunk_size, dtype=result.dtype)
+                return result
+            out = self.buffer[:stop - start]
+        return self.ufunc(*args, out=out)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Evaluates the whole expression chunk by chunk, into the values of out
+    # (a field at the same location) if given, or into a new field (through a
+    # new field if out has ghost layers, its values not being flat)
+    def eval(self, out = None):
+        tot_points = self.template.tot_points
+        if out is not None and out.padded is not None:
+            out.view[...] = self.eval().view
+            return out
+        if out is None:
+            stop   = min(chunk_size, tot_points)
+            first  = self.evaluate(0, stop)
+            out    = self.template.wrap(np.empty(tot_points, dtype=first.dtype))
+            out.values[:stop] = first
+            start  = stop
+        else:
+            start  = 0
+        self.evaluate_into(out.values, start)
+        return out
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Evaluates the chunks from start on into the flat array values
+    def evaluate_into(self, values, start = 0):
+        tot_points = self.template.tot_points
+        while start < tot_points:
+            stop = min(start + chunk_size, tot_points)
+            self.evaluate(start, stop, values[start:stop])
+            start = stop
+        return values
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # NumPy ufunc protocol: ufuncs build nodes (evaluated at once if out is
+    # given, either a field or an array holding the values in flat order)
+    def __array_ufunc__(self, ufunc, method, *inputs, out = None, **kwargs):
+        if method != "__call__" or ufunc.nout != 1 or kwargs:
+            return NotImplemented
+        node = expression_t.build(ufunc, *inputs)
+        if node is None or out is None:
+            return node
+        out = out[0]
+        if not isinstance(out, np.ndarray):
+            return node.eval(out)
+        if out.size != node.template.tot_points:
+            print("ERROR: inconsistent output size (", out.size," vs. ", node.template.tot_points, ")")
+            return None
+        if out.flags.c_contiguous:
+            node.evaluate_into(out.reshape(-1))
+        else:
+            out[...] = node.eval().values.reshape(out.shape)
+        return out
+
+    # ----------------------------------------------------------------------- #
+    # Overload binary operators
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload addition operator
+    def __add__(self, other):
+        return expression_t.build(np.add, self, other)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload subtraction operator
+    def __sub__(self, other):
+        return expression_t.build(np.subtract, self, other)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload multiplication operator
+    def __mul__(self, other):
+        return expression_t.build(np.multiply, self, other)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload truediv ("/") operator
+    def __truediv__(self, other):
+        return expression_t.build(np.true_divide, self, other)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload floordiv ("//") operator
+    def __floordiv__(self, other):
+        return expression_t.build(np.floor_divide, self, other)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload mod ("%") operator
+    def __mod__(self, other):
+        return expression_t.build(np.mod, self, other)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload pow ("**") operator
+    def __pow__(self, other):
+        return expression_t.build(np.power, self, other)
+
+    # ----------------------------------------------------------------------- #
+    # Overload binary operators (inverted operand versions)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload addition operator
+    def __radd__(self, other):
+        return expression_t.build(np.add, other, self)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload subtraction operator
+    def __rsub__(self, other):
+        return expression_t.build(np.subtract, other, self)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload multiplication operator
+    def __rmul__(self, other):
+        return expression_t.build(np.multiply, other, self)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload truediv ("/") operator
+    def __rtruediv__(self, other):
+        return expression_t.build(np.true_divide, other, self)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload floordiv ("//") operator
+    def __rfloordiv__(self, other):
+        return expression_t.build(np.floor_divide, other, self)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload mod ("%") operator
+    def __rmod__(self, other):
+        return expression_t.build(np.mod, other, self)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload pow ("**") operator
+    def __rpow__(self, other):
+        return expression_t.build(np.power, other, self)
+
+    # ----------------------------------------------------------------------- #
+    # Overload unary operators
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload negation operator
+    def __neg__(self):
+        return expression_t.build(np.negative, self)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload identity operator
+    def __pos__(self):
+        return self
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload absolute value operator
+    def __abs__(self):
+        return expression_t.build(np.absolute, self)
@@ -0,0 +1,193 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+import sys
+sys.path.append('../')
+from tools.combination_index import combination_index
+from tools.axis_slice import axis_slice
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class boundary_condition_t:
+    """A condition on a boundary face of the domain: either periodic, or
+    alpha * u + beta * du/dn = value (n being the outward normal)."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor
+    def __init__(self, kind, value = 0.0, alpha = 0.0, beta = 0.0):
+        self.kind  = kind
+        self.value = value
+        self.alpha = alpha
+        self.beta  = beta
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Coefficients of the mirror value and of the condition value giving a
+    # ghost value at distance from its mirror point, the boundary lying
+    # halfway between them (non-periodic conditions only)
+    def ghost_coefficients(self, distance):
+        denominator = 0.5 * self.alpha + self.beta / distance
+        return ((self.beta / distance - 0.5 * self.alpha) / denominator, 1.0 / denominator)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Builders of the supported conditions
+def periodic():
+    return boundary_condition_t("periodic")
+
+def dirichlet(value = 0.0):
+    return boundary_condition_t("dirichlet", value, 1.0, 0.0)
+
+def neumann(value = 0.0):
+    return boundary_condition_t("neumann", value, 0.0, 1.0)
+
+def robin(alpha, beta, value = 0.0):
+    return boundary_condition_t("robin", value, alpha, beta)
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class boundary_conditions_t:
+    """The boundary conditions on every face of a Cartesian mesh, applied
+    through slab views of the first (or last) layers of a field."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor: conditions is a flat list (lower and upper face of each
+    # dimension, as is_periodic); faces without a condition are periodic if
+    # the mesh is, otherwise they have zero normal derivative
+    def __init__(self, mesh, conditions = None):
+        self.mesh = mesh
+        self.conditions = [[None, None] for i in range(mesh.num_dims)]
+        for i in range(mesh.num_dims):
+            for side in range(2):
+                if conditions is not None and conditions[2*i + side] is not None:
+                    self.conditions[i][side] = conditions[2*i + side]
+                elif mesh.is_periodic[i][side]:
+                    self.conditions[i][side] = periodic()
+                else:
+                    self.conditions[i][side] = neumann()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the same conditions with zero values (linear part of the
+    # operators using them)
+    def homogeneous(self):
+        conditions = [None] * (2 * self.mesh.num_dims)
+        for i in range(self.mesh.num_dims):
+            for side in range(2):
+                bc = self.conditions[i][side]
+                conditions[2*i + side] = boundary_condition_t(bc.kind, 0.0, bc.alpha, bc.beta)
+        return boundary_conditions_t(self.mesh, conditions)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns True if the field has nodes (not cell centres) along axis
+    def is_staggered(self, field, axis):
+        return axis in combination_index(self.mesh.num_dims, field.num_directions, field.orientation)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Computes width ghost layers beyond the side (0 lower, 1 upper) of axis.
+    # The lower slab is ordered along the axis (last layer touching the
+    # boundary), the upper one starts at the boundary. Periodic ghost layers
+    # are returned as views of the field, the others are written into out
+    # (allocated if not given).
+    def ghost_slab(self, field, axis, side, width = 1, out = None):
+        u  = field.view
+        bc = self.conditions[axis][side]
+        num_points = u.shape[axis]
+        if bc.kind == "periodic":
+            period = self.mesh.num_cells[axis]
+            if side == 0:
+                sl = slice(period - width, period)
+            else:
+                start = num_points - period
+                sl = slice(start, start + width)
+            ghost = u[axis_slice(u.ndim, axis, sl)]
+            if out is not None:
+                out[...] = ghost
+                return out
+            return ghost
+        if out is None:
+            shape = list(u.shape)
+            shape[axis] = width
+            out = np.empty(shape, dtype=u.dtype, order=self.mesh.array_order())
+        # Distance (in layers) of the ghost layers from the boundary and their
+        # mirror images inside the domain (a basic slice, so that no copy is
+        # taken), ordered as the slab
+        staggered = self.is_staggered(field, axis)
+        if side == 0:
+            layers = np.arange(width, 0, -1)
+            start  = width if staggered else width - 1
+        else:
+            layers = np.arange(1, width + 1)
+            start  = num_points - 2 if staggered else num_points - 1
+        stop   = start - width
+        mirror = slice(start, stop if stop >= 0 else None, -1)
+        if staggered:
+            distance = 2.0 * layers * self.mesh.cell_size[axis]
+            boundary = u[axis_slice(u.ndim, axis, slice(0, 1) if side == 0 else slice(-1, None))]
+        else:
+            distance = (2.0 * layers - 1.0) * self.mesh.cell_size[axis]
+        if width == 1:
+            distance = distance[0]
+        else:
+            shape = [1] * u.ndim
+            shape[axis] = width
+            distance = distance.reshape(shape)
+        inside = u[axis_slice(u.ndim, axis, mirror)]
+        if staggered:
+            if bc.beta == 0.0:
+                # The boundary node holds the prescribed value
+                np.multiply(inside, -0.5 * bc.alpha, out=out)
+                np.add(out, bc.value, out=out)
+                np.multiply(out, 2.0 / bc.alpha, out=out)
+            else:
+                np.multiply(boundary, -bc.alpha, out=out)
+                np.add(out, bc.value, out=out)
+                np.multiply(out, distance / bc.beta, out=out)
+                np.add(out, inside, out=out)
+        else:
+            # value_coeff * (mirror_coeff / value_coeff * inside + value), with
+            # no temporary even if the value is an array
+            (mirror_coeff, value_coeff) = bc.ghost_coefficients(distance)
+            np.multiply(inside, mirror_coeff / value_coeff, out=out)
+            np.add(out, bc.value, out=out)
+            np.multiply(out, value_coeff, out=out)
+        return out
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Applies the conditions to a field: sets the boundary nodes of Dirichlet
+    # faces (for fields with nodes along the face normal) and fills the ghost
+    # layers of the field, if it has any (once all the boundary nodes are set,
+    # as periodic layers copy them)
+    def apply(self, field):
+        u = field.view
+        for i in range(self.mesh.num_dims):
+            if self.is_staggered(field, i):
+                for side in range(2):
+                    bc = self.conditions[i][side]
+                    if bc.kind != "periodic" and bc.beta == 0.0:
+                        u[axis_slice(u.ndim, i, 0 if side == 0 else -1)] = bc.value / bc.alpha
+        if field.padded is not None:
+            for i in range(self.mesh.num_dims):
+                for side in range(2):
+                    self.ghost_slab(field, i, side, field.halo_width, field.halo_slab(i, side))
+        return field
@@ -28,6 +28,8 @@ import math
 import sys
 sys.path.append('../')
 from tools.combination_index import combination_index
+from mesh.boundary_conditions import boundary_conditions_t
+from operators import sparse_operators
 
 reverse_order = False
 
@@ -38,14 +40,19 @@ class cartesian_mesh_t:
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Constructor
-    def __init__(self, domain, num_cells, is_periodic = None):
+    def __init__(self, domain, num_cells, is_periodic = None, dtype = np.float64, halo_width = 0, \
+                 boundary_conditions = None):
 
+        # Floating point type of coordinates (and default type of fields)
+        self.dtype = np.dtype(dtype)
+        # Number of ghost layers of fields on the mesh (default)
+        self.halo_width = halo_width
         # Number of dimensions of the domain
         self.num_dims  = len(num_cells)
         # Number of cells along each dimension (list)
         self.num_cells = [None] * self.num_dims
         # Domain limits along each dimension (list of lists)
-        self.domain    = [[None] * 2] * self.num_dims
+        self.domain    = [[None] * 2 for i in range(self.num_dims)]
         # Domain sizes
         self.domain_size = [None] * self.num_dims
         # Dimension orderings
@@ -71,9 +78,9 @@ class cartesian_mesh_t:
             self.cell_size[i]    = (self.domain[i][1] - self.domain[i][0]) / self.num_cells[i]
             self.cell_centres[i] = np.linspace(self.domain[i][0] + 0.5 * self.cell_size[i], \
                                                self.domain[i][1] - 0.5 * self.cell_size[i], \
-                                               self.num_cells[i])
+                                               self.num_cells[i], dtype=self.dtype)
             self.cell_faces[i]   = np.linspace(self.domain[i][0], self.domain[i][1], \
-                                               (self.num_cells[i] + 1))
+                                               (self.num_cells[i] + 1), dtype=self.dtype)
 
         # Domain volume
         self.domain_volume = np.prod(self.domain_size)
@@ -81,12 +88,15 @@ class cartesian_mesh_t:
         self.cell_volume   = np.prod(self.cell_size)
 
         # Assigns the periodicity of the domain boundaries
-        self.is_periodic = [[False] * 2] * self.num_dims
+        self.is_periodic = [[False] * 2 for i in range(self.num_dims)]
         if is_periodic != None:
             for i in range(0, self.num_dims):
                 self.is_periodic[i][0] = is_periodic[2*i]
                 self.is_periodic[i][1] = is_periodic[2*i+1]
 
+        # Boundary conditions of the fields on the mesh (default)
+        self.set_boundary_conditions(boundary_conditions)
+
         # Assigns numbers of cells, faces, edges, corners.
         # Cells
         self.tot_cells = math.prod(self.num_cells)
@@ -102,6 +112,17 @@ class cartesian_mesh_t:
         self.tot_points = [[self.tot_cells], self.tot_faces, self.tot_edges, self.tot_corners]
         self.tot_point_orientations = [1, self.num_face_orientations, self.num_edge_orientations, self.num_corner_orientations]
 
+        # Index layout (fixed at construction) and stride tables
+        self.reverse_order = reverse_order
+        self.strides = [[self.cmp_strides(n, i) for i in range(self.tot_point_orientations[n])] \
+                        for n in range(4)]
+        # Strides from the slowest to the fastest varying axis
+        self.ordered_strides = [[tuple(strides[i] for i in self.dimension_orderings[reverse_order]) \
+                                 for strides in self.strides[n]] for n in range(4)]
+        # Smallest integer type able to hold any global index of the mesh
+        max_points = max([max(tot) for tot in self.tot_points if tot])
+        self.index_dtype = np.int32 if max_points <= np.iinfo(np.int32).max else np.int64
+
         # Computes cell face areas and edge lengths
         # Faces
         self.cell_faces_area = [1] * self.num_face_orientations
@@ -119,29 +140,69 @@ class cartesian_mesh_t:
                     self.cell_edges_length[i] *= self.cell_size[j]
         del(comb_idx)
 
-        # Initializes coordinate fields
-        # Cells
-        self.cell_centre_array = self.cmp_coords()
-        # Faces
-        self.cell_face_arrays = [None] * self.num_face_orientations
-        for i in range(self.num_face_orientations):
-            self.cell_face_arrays[i] = self.cmp_coords(1, i)
-        # Edges
-        self.cell_edge_arrays = [None] * self.num_edge_orientations
-        if self.num_dims > 1:
-            for i in range(self.num_edge_orientations):
-                self.cell_edge_arrays[i] = self.cmp_coords(2, i)
-        # Corners
-        self.cell_corner_arrays = [None] * self.num_corner_orientations
-        if self.num_dims > 2:
-            for i in range(self.num_corner_orientations):
-                self.cell_corner_arrays[i] = self.cmp_coords(3, i)
+        # Coordinate arrays are computed on demand and cached (see coords)
+        self.coord_cache = {}
+        # Boundary and neighbour index sets are computed on demand and cached
+        # (see boundary_indices and neighbour_indices)
+        self.index_cache = {}
+        # Sparse matrices of the operators are assembled on demand and cached
+        # (see sparse_operator)
+        self.operator_cache = {}
+        # One-layer ghost slabs of fields without a halo are computed into
+        # buffers allocated on demand and reused (see ghost_buffer)
+        self.ghost_cache = {}
+        # Work arrays of operators (for example the intermediate locations of
+        # interpolations) are allocated on demand and reused (see work_buffer)
+        self.work_cache = {}
 
         # Lists of lists (of lists)
-        self.cell_coord_arrays = [[self.cell_centre_array], self.cell_face_arrays, \
-                                   self.cell_edge_arrays, self.cell_corner_arrays]
+        self.cell_coord_arrays = [coord_arrays_t(self, n, self.tot_point_orientations[n]) \
+                                  for n in range(4)]
         self.cell_dimensions   = [[self.cell_volume], self.cell_faces_area, self.cell_edges_length]
 
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Assigns the boundary conditions (flat list of boundary_condition_t, lower
+    # and upper face of each dimension); faces left to None follow is_periodic
+    def set_boundary_conditions(self, conditions = None):
+        self.boundary_conditions = boundary_conditions_t(self, conditions)
+        return self.boundary_conditions
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Lazy coordinate arrays (cells, faces, edges and corners)
+    @property
+    def cell_centre_array(self):
+        return self.coords()
+
+    @property
+    def cell_face_arrays(self):
+        return self.cell_coord_arrays[1]
+
+    @property
+    def cell_edge_arrays(self):
+        return self.cell_coord_arrays[2]
+
+    @property
+    def cell_corner_arrays(self):
+        return self.cell_coord_arrays[3]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the (cached) coordinates for (cells, faces, edges or corners)
+    #                   n = num_directions (n = 0, n = 1, n = 2 or n = 3  )
+    def coords(self, num_directions = 0, orientation = 0):
+        key = (num_directions, orientation)
+        if key not in self.coord_cache:
+            self.coord_cache[key] = self.cmp_coords(num_directions, orientation)
+        return self.coord_cache[key]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Drops cached coordinates (all of them if num_directions is None,
+    # all orientations of a location if orientation is None)
+    def clear_coords(self, num_directions = None, orientation = None):
+        for key in list(self.coord_cache):
+            if (num_directions is None or key[0] == num_directions) and \
+               (orientation is None or key[1] == orientation):
+                del self.coord_cache[key]
+
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Spans dimensions in a circular way
     def rotate_dim(self, i, j = 1):
@@ -174,48 +235,249 @@ class cartesian_mesh_t:
         return (num_points, tot_points, num_orientations)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
-    # Computes a global index for (cells, faces, edges or corners)
-    #          n = num_directions (n = 0, n = 1, n = 2 or n = 3  )
-    def global_index(self, indices, num_directions = 0, orientation = 0):
+    # Computes the strides of the global index for (cells, faces, edges or corners)
+    #                                n = num_directions (n = 0, n = 1, n = 2 or n = 3  )
+    def cmp_strides(self, num_directions = 0, orientation = 0):
+        strides = [0] * self.num_dims
         stride = 1
-        if type(indices[0]) == int:
-            index = 0
-        elif type(indices[0]) == np.ndarray:
-            index = np.zeros(np.size(indices[0]), dtype=int)
-        for i in self.dimension_orderings[not reverse_order]:
-            index = index + indices[i] * stride
+        for i in self.dimension_orderings[not self.reverse_order]:
+            strides[i] = stride
             stride *= self.num_points[num_directions][orientation][i]
-        return index
+        return tuple(strides)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Computes a global index for (cells, faces, edges or corners)
+    #          n = num_directions (n = 0, n = 1, n = 2 or n = 3  )
+    # Arrays of indices are converted in place into out (allocated with
+    # index_dtype if not given), without temporaries
+    def global_index(self, indices, num_directions = 0, orientation = 0, out = None):
+        first = indices[0]
+        if out is None and (type(first) is int or isinstance(first, np.integer)):
+            strides = self.strides[num_directions][orientation]
+            index = first * strides[0]
+            for i in range(1, self.num_dims):
+                index += indices[i] * strides[i]
+            return index
+        num_points = self.num_points[num_directions][orientation]
+        dims = self.dimension_orderings[self.reverse_order]
+        if out is None:
+            out = np.empty(np.shape(indices[0]), dtype=self.index_dtype)
+        # Horner scheme from the slowest to the fastest varying dimension
+        np.copyto(out, indices[dims[0]], casting='unsafe')
+        for i in dims[1:]:
+            np.multiply(out, num_points[i], out=out)
+            np.add(out, indices[i], out=out, casting='unsafe')
+        return out
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
     # Computes local index tuple for (cells, faces, edges or corners)
     #             n = num_directions (n = 0, n = 1, n = 2 or n = 3  )
-    def local_index(self, index, num_directions = 0, orientation = 0):
-        stride = self.tot_points[num_directions]
-        if type(stride)==list: stride = stride[orientation]
-        indices = [0] * self.num_dims
-        for i in self.dimension_orderings[reverse_order]:
-            stride = stride // self.num_points[num_directions][orientation][i]
-            indices[i] = index // stride
-            index = index % stride
-        return tuple(indices)
+    # Arrays of indices are converted into the arrays of out (allocated with
+    # index_dtype if not given)
+    def local_index(self, index, num_directions = 0, orientation = 0, out = None):
+        if out is None and (type(index) is int or isinstance(index, np.integer)):
+            indices = []
+            for stride in self.ordered_strides[num_directions][orientation]:
+                (quotient, index) = divmod(index, stride)
+                indices.append(quotient)
+            if self.reverse_order:
+                indices.reverse()
+            return tuple(indices)
+        strides = self.strides[num_directions][orientation]
+        dims = self.dimension_orderings[self.reverse_order]
+        if out is None:
+            out = tuple(np.empty(np.shape(index), dtype=self.index_dtype) \
+                        for i in range(self.num_dims))
+        # The fastest varying index holds the remainder of the divisions:
+        # remainder -= quotient * stride, restoring the quotient afterwards
+        # (divisions by a scalar are much faster than divmod)
+        remainder = out[dims[-1]]
+        np.copyto(remainder, index, casting='unsafe')
+        for i in dims[:-1]:
+            quotient = out[i]
+            np.floor_divide(remainder, strides[i], out=quotient)
+            np.multiply(quotient, strides[i], out=quotient)
+            np.subtract(remainder, quotient, out=remainder)
+            np.floor_divide(quotient, strides[i], out=quotient)
+        return tuple(out)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
-    # Computes coordinates for (cells, faces, edges or corners)
-    #       n = num_directions (n = 0, n = 1, n = 2 or n = 3  )
-    def cmp_coords(self, num_directions = 0, orientation = 0):
-        indexes  =  self.local_index(np.linspace(0, \
-                    self.tot_points[num_directions][orientation]-1, \
-                    self.tot_points[num_directions][orientation], dtype=int), \
-                    num_directions, orientation)
+    # Memory order of the structured arrays matching global_index
+    def array_order(self):
+        return 'F' if self.reverse_order else 'C'
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Computes 1D coordinates along each axis for (cells, faces, edges or corners)
+    #                            n = num_directions (n = 0, n = 1, n = 2 or n = 3  )
+    def axis_coords(self, num_directions = 0, orientation = 0):
         comb_idx = combination_index(self.num_dims, num_directions, orientation)
         if comb_idx==None: comb_idx=()
-        coords = [0] * self.num_dims
+        num_points = self.num_points[num_directions][orientation]
+        coords = [None] * self.num_dims
         for i in range(self.num_dims):
             if i in comb_idx:
                 x0 = self.domain[i][0]
             else:
                 x0 = self.domain[i][0] + 0.5 * self.cell_size[i]
-            coords[i] = x0 + self.cell_size[i] * indexes[i]
+            coords[i] = (x0 + self.cell_size[i] * np.arange(num_points[i])).astype(self.dtype)
         return coords
 
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Computes open-grid coordinates (np.ix_ style), each array having the
+    # shape of the structured layout along its own axis and 1 elsewhere
+    def open_coords(self, num_directions = 0, orientation = 0):
+        return list(np.ix_(*self.axis_coords(num_directions, orientation)))
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Computes full-shape coordinate views of the structured layout, with zero
+    # strides along the axes a coordinate does not depend on (read-only)
+    def grid_coords(self, num_directions = 0, orientation = 0):
+        shape = tuple(self.num_points[num_directions][orientation])
+        return [np.broadcast_to(x, shape) \
+                for x in self.open_coords(num_directions, orientation)]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Computes coordinates for (cells, faces, edges or corners)
+    #       n = num_directions (n = 0, n = 1, n = 2 or n = 3  )
+    def cmp_coords(self, num_directions = 0, orientation = 0):
+        return [np.ravel(x, order=self.array_order()) \
+                for x in self.grid_coords(num_directions, orientation)]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the (cached) flat offsets of the neighbours of a point of
+    # (cells, faces, edges or corners) along each axis, as a (num_dims, 2)
+    # array (lower and upper neighbour)
+    def neighbour_offsets(self, num_directions = 0, orientation = 0):
+        key = ("offsets", num_directions, orientation)
+        if key not in self.index_cache:
+            strides = np.array(self.strides[num_directions][orientation], dtype=self.index_dtype)
+            self.index_cache[key] = np.stack((-strides, strides), axis=1)
+        return self.index_cache[key]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the (cached) sorted global indices of the points of (cells,
+    # faces, edges or corners) on the first (side = 0) or last (side = 1)
+    # layer along axis
+    def boundary_indices(self, axis, side, num_directions = 0, orientation = 0):
+        key = ("boundary", axis, side, num_directions, orientation)
+        if key not in self.index_cache:
+            self.index_cache[key] = self.cmp_boundary_indices(axis, side, num_directions, orientation)
+        return self.index_cache[key]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Computes the global indices of a boundary layer from the stride table
+    def cmp_boundary_indices(self, axis, side, num_directions = 0, orientation = 0):
+        num_points = self.num_points[num_directions][orientation]
+        strides    = self.strides[num_directions][orientation]
+        terms = [np.arange(num_points[i], dtype=self.index_dtype) * strides[i] \
+                 for i in range(self.num_dims)]
+        layer = 0 if side == 0 else num_points[axis] - 1
+        terms[axis] = np.array([layer * strides[axis]], dtype=self.index_dtype)
+        index = np.zeros([len(term) for term in terms], dtype=self.index_dtype)
+        for term in np.ix_(*terms):
+            np.add(index, term, out=index)
+        return np.ravel(index, order=self.array_order())
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the (cached) global indices of the lower (side = 0) or upper
+    # (side = 1) neighbour along axis of every point of (cells, faces, edges or
+    # corners): boundary points wrap around on periodic axes and get -1
+    # otherwise
+    def neighbour_indices(self, axis, side, num_directions = 0, orientation = 0):
+        key = ("neighbours", axis, side, num_directions, orientation)
+        if key not in self.index_cache:
+            tot_points = self.tot_points[num_directions][orientation]
+            offset = self.neighbour_offsets(num_directions, orientation)[axis][side]
+            neighbours = np.arange(offset, tot_points + offset, dtype=self.index_dtype)
+            boundary = self.boundary_indices(axis, side, num_directions, orientation)
+            if self.is_periodic[axis][side]:
+                # One period back (or forward) from the point beyond the boundary
+                shift = self.num_cells[axis] * self.strides[num_directions][orientation][axis]
+                neighbours[boundary] += shift if side == 0 else -shift
+            else:
+                neighbours[boundary] = -1
+            self.index_cache[key] = neighbours
+        return self.index_cache[key]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Drops cached index sets
+    def clear_indices(self):
+        self.index_cache = {}
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the (cached) buffer of a one-layer ghost slab beyond the side
+    # (0 lower, 1 upper) of axis for (cells, faces, edges or corners) values
+    # of the given dtype. Its content is overwritten by the next request.
+    def ghost_buffer(self, axis, side, num_directions = 0, orientation = 0, dtype = None):
+        dtype = self.dtype if dtype is None else np.dtype(dtype)
+        key = (axis, side, num_directions, orientation, dtype)
+        if key not in self.ghost_cache:
+            shape = list(self.num_points[num_directions][orientation])
+            shape[axis] = 1
+            self.ghost_cache[key] = np.empty(shape, dtype=dtype, order=self.array_order())
+        return self.ghost_cache[key]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the (cached) flat work buffer identified by key, with at least size
+    # values of the given dtype (reallocated only if a larger size is requested).
+    # Its content is overwritten by the next user of the same key.
+    def work_buffer(self, key, size, dtype = None):
+        dtype = self.dtype if dtype is None else np.dtype(dtype)
+        key = (key, dtype)
+        if key not in self.work_cache or self.work_cache[key].shape[0] < size:
+            self.work_cache[key] = np.empty(size, dtype=dtype)
+        return self.work_cache[key][:size]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the (cached) CSR matrix of an operator ("laplacian" on the cells,
+    # "gradient" from the cells to the stacked faces, "divergence" from the
+    # stacked faces to the cells), in global_index order, for the given
+    # boundary conditions (the mesh ones by default)
+    def sparse_operator(self, name, boundary_conditions = None):
+        if name not in sparse_operators.builders:
+            print("ERROR: unknown sparse operator: ", name)
+            return None
+        if boundary_conditions is None:
+            boundary_conditions = self.boundary_conditions
+        key = (name, sparse_operators.boundary_key(boundary_conditions))
+        if key not in self.operator_cache:
+            matrix = sparse_operators.builders[name](self, boundary_conditions)
+            if matrix is None:
+                return None
+            self.operator_cache[key] = matrix
+        return self.operator_cache[key]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Drops cached operator matrices
+    def clear_operators(self):
+        self.operator_cache = {}
+
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class coord_arrays_t:
+    """A list-like view of the coordinate arrays of every orientation of a mesh
+    location, computing each of them only when it is first accessed."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor
+    def __init__(self, mesh, num_directions, num_orientations):
+        self.mesh             = mesh
+        self.num_directions   = num_directions
+        self.num_orientations = num_orientations
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # List-like access
+    def __len__(self):
+        return self.num_orientations
+
+    def __getitem__(self, orientation):
+        if orientation < 0:
+            orientation += self.num_orientations
+        if orientation < 0 or orientation >= self.num_orientations:
+            raise IndexError("orientation index out of range")
+        return self.mesh.coords(self.num_directions, orientation)
+
+    def __iter__(self):
+        for i in range(self.num_orientations):
+            yield self[i]
@@ -0,0 +1,257 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+import sys
+sys.path.append('../')
+from fields.field import field_t
+from tools.axis_slice import axis_slice
+from tools.combination_index import combination_index
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Computes the gradient of a cell field on the faces (one field per face
+# orientation), writing into the face fields of out if given.
+# Boundary faces use the ghost layers given by the boundary conditions of the
+# field (its halo, filled here, if it has one).
+def gradient(field, out = None):
+    mesh = field.mesh
+    if field.num_directions != 0:
+        print("ERROR: the gradient requires a cell field (num_directions = ", \
+              field.num_directions, ")")
+        return None
+    if out is None:
+        out = [field_t(mesh, 0.0, 1, i, dtype=field.dtype, halo_width=0) \
+               for i in range(mesh.num_face_orientations)]
+    u = field.view
+    field.fill_halo()
+    if field.padded is not None:
+        # Differences of the padded array, ghost layers included
+        for i in range(mesh.num_dims):
+            g = out[i].view
+            n = field.shape[i]
+            np.subtract(field.padded_slice(i, 0, n + 1), field.padded_slice(i, -1, n), out=g)
+            np.multiply(g, 1.0 / mesh.cell_size[i], out=g)
+        return out
+    for i in range(mesh.num_dims):
+        # Face orientation i is normal to axis i
+        g = out[i].view
+        first = axis_slice(mesh.num_dims, i, slice(0, 1))
+        last  = axis_slice(mesh.num_dims, i, slice(-1, None))
+        np.subtract(u[axis_slice(mesh.num_dims, i, slice(1, None))], \
+                    u[axis_slice(mesh.num_dims, i, slice(None, -1))], \
+                    out=g[axis_slice(mesh.num_dims, i, slice(1, -1))])
+        (ghost_lower, ghost_upper) = field.ghost_layers(i)
+        np.subtract(u[first], ghost_lower, out=g[first])
+        np.subtract(ghost_upper, u[last], out=g[last])
+        np.multiply(g, 1.0 / mesh.cell_size[i], out=g)
+    return out
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Returns a view with the given shape on the start of a flat work array
+def work_view(work, shape, order):
+    return work[:int(np.prod(shape))].reshape(shape, order=order)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Computes the divergence of face fields (one per face orientation) on the
+# cells, as the sum of the face fluxes (face areas) over the cell volume.
+# out (cell field) and work (flat array with one value per cell) can be
+# preallocated to avoid any allocation.
+def divergence(faces, out = None, work = None):
+    mesh  = faces[0].mesh
+    order = mesh.array_order()
+    if out is None:
+        out = field_t(mesh, 0.0, dtype=faces[0].dtype, halo_width=0)
+    if work is None:
+        work = np.empty(mesh.tot_cells, dtype=out.dtype)
+    d = out.view
+    for i in range(mesh.num_dims):
+        f = faces[i].view
+        coeff = mesh.cell_faces_area[i] / mesh.cell_volume
+        if i == 0:
+            w = d
+        else:
+            w = work_view(work, d.shape, order)
+        np.subtract(f[axis_slice(mesh.num_dims, i, slice(1, None))], \
+                    f[axis_slice(mesh.num_dims, i, slice(None, -1))], out=w)
+        np.multiply(w, coeff, out=w)
+        if i > 0:
+            np.add(d, w, out=d)
+    return out
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Computes the Laplacian of a cell field on the cells (divergence of the
+# gradient, without storing the face fields): for each direction the face
+# differences are scaled by area / (spacing * volume) and scattered to the
+# two neighbouring cells. Boundary fluxes use the ghost layers given by the
+# boundary conditions of the field (its halo, filled here, if it has one).
+# out (cell field) and work (flat array with one value per cell) can be
+# preallocated to avoid any allocation.
+def laplacian(field, out = None, work = None):
+    mesh  = field.mesh
+    order = mesh.array_order()
+    if field.num_directions != 0:
+        print("ERROR: the Laplacian requires a cell field (num_directions = ", \
+              field.num_directions, ")")
+        return None
+    if out is None:
+        out = field_t(mesh, 0.0, dtype=field.dtype, halo_width=0)
+    if work is None:
+        work = np.empty(mesh.tot_cells, dtype=out.dtype)
+    u = field.view
+    d = out.view
+    field.fill_halo()
+    if field.padded is not None:
+        # Sums of the neighbours along each axis (slices of the padded array,
+        # ghost layers included) scaled by area / (spacing * volume), minus
+        # twice the total coefficient times the field
+        coeffs = [mesh.cell_faces_area[i] / (mesh.cell_size[i] * mesh.cell_volume) \
+                  for i in range(mesh.num_dims)]
+        w = work_view(work, d.shape, order)
+        for i in range(mesh.num_dims):
+            n = field.shape[i]
+            acc = d if i == 0 else w
+            np.add(field.padded_slice(i, 1, n + 1), field.padded_slice(i, -1, n - 1), out=acc)
+            np.multiply(acc, coeffs[i], out=acc)
+            if i > 0:
+                np.add(d, w, out=d)
+        np.multiply(u, 2.0 * sum(coeffs), out=w)
+        np.subtract(d, w, out=d)
+        return out
+    d[...] = 0.0
+    for i in range(mesh.num_dims):
+        coeff = mesh.cell_faces_area[i] / (mesh.cell_size[i] * mesh.cell_volume)
+        lower = axis_slice(mesh.num_dims, i, slice(None, -1))
+        upper = axis_slice(mesh.num_dims, i, slice(1, None))
+        # Interior face fluxes
+        w = work_view(work, u[lower].shape, order)
+        np.subtract(u[upper], u[lower], out=w)
+        np.multiply(w, coeff, out=w)
+        np.add(d[lower], w, out=d[lower])
+        np.subtract(d[upper], w, out=d[upper])
+        # Boundary face fluxes
+        first = axis_slice(mesh.num_dims, i, slice(0, 1))
+        last  = axis_slice(mesh.num_dims, i, slice(-1, None))
+        w = work_view(work, u[first].shape, order)
+        (ghost_lower, ghost_upper) = field.ghost_layers(i)
+        np.subtract(u[first], ghost_lower, out=w)
+        np.multiply(w, coeff, out=w)
+        np.subtract(d[first], w, out=d[first])
+        np.subtract(ghost_upper, u[last], out=w)
+        np.multiply(w, coeff, out=w)
+        np.add(d[last], w, out=d[last])
+    return out
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Sign of the term differentiating along axis i a component along axis j in
+# the curl (Levi-Civita symbol of (i, j, k), with k = 2 in two dimensions)
+def curl_sign(i, j):
+    return 1.0 if (j - i) % 3 == 1 else -1.0
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Computes the curl of edge fields (tangential components, one field per
+# edge orientation) on the faces (normal components, one field per face
+# orientation), as the circulation along the face boundary (edge lengths)
+# over the face area. In two dimensions the edges are the cell corners and
+# the single edge field is the out-of-plane component.
+# out (face fields) and work (flat array as large as the largest face
+# field) can be preallocated to avoid any allocation.
+def curl_edges_to_faces(edges, out = None, work = None):
+    mesh  = edges[0].mesh
+    order = mesh.array_order()
+    if mesh.num_dims not in (2, 3):
+        print("ERROR: the curl requires a 2D or 3D mesh (num_dims = ", mesh.num_dims, ")")
+        return None
+    if out is None:
+        out = [field_t(mesh, 0.0, 1, i, dtype=edges[0].dtype, halo_width=0) \
+               for i in range(mesh.num_face_orientations)]
+    if work is None:
+        work = np.empty(max(mesh.tot_faces), dtype=out[0].dtype)
+    for i in range(mesh.num_dims):
+        c = out[i].view
+        first = True
+        for j in range(mesh.num_dims):
+            if j == i:
+                continue
+            e = combination_index(mesh.num_dims, 2, (i, j))
+            v = edges[e].view
+            coeff = curl_sign(i, j) * mesh.cell_edges_length[e] / mesh.cell_faces_area[i]
+            w = c if first else work_view(work, c.shape, order)
+            np.subtract(v[axis_slice(mesh.num_dims, j, slice(1, None))], \
+                        v[axis_slice(mesh.num_dims, j, slice(None, -1))], out=w)
+            np.multiply(w, coeff, out=w)
+            if not first:
+                np.add(c, w, out=c)
+            first = False
+    return out
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Computes the curl of face fields (normal components, one field per face
+# orientation) on the edges (one field per edge orientation), as the
+# circulation along the dual edges (cell spacings) over the dual face area.
+# Boundary edges use the ghost layers given by the boundary conditions of the
+# face fields (their halos, filled here, if they have any).
+# out (edge fields) and work (flat array as large as the largest edge
+# field) can be preallocated to avoid any allocation.
+def curl_faces_to_edges(faces, out = None, work = None):
+    mesh  = faces[0].mesh
+    order = mesh.array_order()
+    if mesh.num_dims not in (2, 3):
+        print("ERROR: the curl requires a 2D or 3D mesh (num_dims = ", mesh.num_dims, ")")
+        return None
+    if out is None:
+        out = [field_t(mesh, 0.0, 2, e, dtype=faces[0].dtype, halo_width=0) \
+               for e in range(mesh.num_edge_orientations)]
+    if work is None:
+        work = np.empty(max(mesh.tot_edges), dtype=out[0].dtype)
+    for field in faces:
+        if field.padded is not None:
+            field.fill_halo()
+    for e in range(mesh.num_edge_orientations):
+        c = out[e].view
+        c[...] = 0.0
+        (a, b) = combination_index(mesh.num_dims, 2, e)
+        dual_area = mesh.cell_volume / mesh.cell_edges_length[e]
+        for (p, q) in ((a, b), (b, a)):
+            v = faces[q].view
+            coeff = curl_sign(p, q) * mesh.cell_size[q] / dual_area
+            # Interior edges along p
+            inner = axis_slice(mesh.num_dims, p, slice(1, -1))
+            w = work_view(work, c[inner].shape, order)
+            np.subtract(v[axis_slice(mesh.num_dims, p, slice(1, None))], \
+                        v[axis_slice(mesh.num_dims, p, slice(None, -1))], out=w)
+            np.multiply(w, coeff, out=w)
+            np.add(c[inner], w, out=c[inner])
+            # Boundary edges along p
+            first = axis_slice(mesh.num_dims, p, slice(0, 1))
+            last  = axis_slice(mesh.num_dims, p, slice(-1, None))
+            w = work_view(work, c[first].shape, order)
+            (ghost_lower, ghost_upper) = faces[q].ghost_layers(p)
+            np.subtract(v[first], ghost_lower, out=w)
+            np.multiply(w, coeff, out=w)
+            np.add(c[first], w, out=c[first])
+            np.subtract(ghost_upper, v[last], out=w)
+            np.multiply(w, coeff, out=w)
+            np.add(c[last], w, out=c[last])
+    return out
@@ -0,0 +1,153 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+import sys
+sys.path.append('../')
+from fields.field import field_t
+from tools.axis_slice import axis_slice
+from tools.combination_index import combination_index
+from operators.differential import work_view
+
+# Midpoint interpolation stencils (offsets from the first point on the left of
+# the midpoint, and weights) by order of accuracy
+stencils = {2: ((0, 1), (0.5, 0.5)), \
+            4: ((-1, 0, 1, 2), (-1.0 / 16.0, 9.0 / 16.0, 9.0 / 16.0, -1.0 / 16.0))}
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Interpolates the structured array src into dst at the midpoints along axis:
+# from cell centres to nodes if to_nodes is True (dst has one more point along
+# axis), from nodes to cell centres otherwise (dst has one point less).
+# Points too close to a non-periodic boundary for the stencil use second
+# order averages (and boundary nodes take the value of the nearest centre).
+def interpolate_axis(src, dst, axis, to_nodes, periodic, order, work, memory_order = 'C'):
+    num_dims  = src.ndim
+    num_cells = dst.shape[axis] - 1 if to_nodes else dst.shape[axis]
+    num_src   = src.shape[axis]
+    (offsets, weights) = stencils[order]
+    # Position of the first source point on the left of destination point k
+    shift = -1 if to_nodes else 0
+    # Interior destination points, for which the whole stencil is available
+    k0 = max(0, -(shift + offsets[0]))
+    k1 = min(dst.shape[axis], num_src - (shift + offsets[-1]))
+    if k1 > k0:
+        d = dst[axis_slice(num_dims, axis, slice(k0, k1))]
+        w = work_view(work, d.shape, memory_order)
+        for m in range(len(offsets)):
+            start = k0 + shift + offsets[m]
+            s = src[axis_slice(num_dims, axis, slice(start, start + k1 - k0))]
+            if m == 0:
+                np.multiply(s, weights[m], out=d)
+            else:
+                np.multiply(s, weights[m], out=w)
+                np.add(d, w, out=d)
+    # Boundary destination points (only a few slabs)
+    for k in list(range(0, k0)) + list(range(max(k1, k0), dst.shape[axis])):
+        d = dst[axis_slice(num_dims, axis, slice(k, k + 1))]
+        if periodic:
+            (slab_offsets, slab_weights) = (offsets, weights)
+        else:
+            (slab_offsets, slab_weights) = stencils[2]
+        d[...] = 0.0
+        for m in range(len(slab_offsets)):
+            j = k + shift + slab_offsets[m]
+            if periodic:
+                j %= num_cells
+            else:
+                j = min(max(j, 0), num_src - 1)
+            d += slab_weights[m] * src[axis_slice(num_dims, axis, slice(j, j + 1))]
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Interpolates a field to another location (num_directions, orientation) of the
+# mesh by midpoint averaging along each axis where the two locations differ
+# (cell <-> face, face <-> edge, edge <-> corner in one step, other pairs through
+# intermediate locations). order selects the stencil (2 or 4); the boundary
+# conditions of the field tell which axes are periodic.
+# out (field at the target location) and work (flat array as large as the
+# largest location involved) can be preallocated; the intermediate locations
+# (and work, if it is not given or too small) use mesh work buffers cached per
+# source and target location, so that no allocation is repeated.
+def interpolate(field, num_directions, orientation, out = None, order = 2, work = None):
+    mesh = field.mesh
+    if order not in stencils:
+        print("ERROR: unsupported interpolation order: ", order)
+        return None
+    src_dirs = set(combination_index(mesh.num_dims, field.num_directions, field.orientation))
+    dst_dirs = set(combination_index(mesh.num_dims, num_directions, orientation))
+    # Sequence of single-axis steps (removals first, to keep arrays small)
+    steps = [(a, False) for a in sorted(src_dirs - dst_dirs)] + \
+            [(a, True) for a in sorted(dst_dirs - src_dirs)]
+    if out is None:
+        out = field_t(mesh, 0.0, num_directions, orientation, dtype=field.dtype, halo_width=0)
+    if len(steps) == 0:
+        out.view[...] = field.view
+        return out
+    # Locations reached after each step
+    locations = [None] * len(steps)
+    dirs = set(src_dirs)
+    for s in range(len(steps)):
+        (axis, to_nodes) = steps[s]
+        if to_nodes:
+            dirs.add(axis)
+        else:
+            dirs.discard(axis)
+        locations[s] = (len(dirs), combination_index(mesh.num_dims, len(dirs), tuple(sorted(dirs))))
+    key = ("interpolation", field.num_directions, field.orientation, num_directions, orientation)
+    work_size = max([mesh.tot_points[n][o] for (n, o) in locations])
+    if work is None or work.shape[0] < work_size:
+        work = mesh.work_buffer(key + ("work",), work_size, out.dtype)
+    periodic = [sides[0].kind == "periodic" for sides in field.get_boundary_conditions().conditions]
+    current = field.view
+    for s in range(len(steps)):
+        (axis, to_nodes) = steps[s]
+        if s == len(steps) - 1:
+            target = out.view
+        else:
+            (n, o) = locations[s]
+            target = mesh.work_buffer(key + (s,), mesh.tot_points[n][o], field.dtype) \
+                         .reshape(mesh.num_points[n][o], order=mesh.array_order())
+        interpolate_axis(current, target, axis, to_nodes, periodic[axis], order, work, mesh.array_order())
+        current = target
+    return out
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Interpolates a cell field to the faces (one field per face orientation)
+def cells_to_faces(field, out = None, order = 2, work = None):
+    mesh = field.mesh
+    if out is None:
+        out = [None] * mesh.num_face_orientations
+    for i in range(mesh.num_face_orientations):
+        out[i] = interpolate(field, 1, i, out[i], order, work)
+    return out
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Interpolates face fields (one per face orientation) to the cells, returning
+# one cell field per face orientation
+def faces_to_cells(faces, out = None, order = 2, work = None):
+    if out is None:
+        out = [None] * len(faces)
+    for i in range(len(faces)):
+        out[i] = interpolate(faces[i], 0, 0, out[i], order, work)
+    return out
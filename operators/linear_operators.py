@@ -0,0 +1,171 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+import sys
+sys.path.append('../')
+from fields.field import field_t
+from operators.differential import gradient, divergence, laplacian
+try:
+    import scipy.sparse.linalg as sparse_linalg
+except ImportError:
+    sparse_linalg = None
+try:
+    # In-place CSR kernel (y += A x) of scipy
+    from scipy.sparse._sparsetools import csr_matvec
+except ImportError:
+    csr_matvec = None
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class linear_operator_t:
+    """A matrix-free linear operator acting on the flat values of fields."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor: apply(x, out) writes the product of the operator with the
+    # flat array x into the flat array out; diagonal (optional) holds the
+    # diagonal of the operator
+    def __init__(self, shape, apply, dtype = np.float64, diagonal = None):
+        self.shape = tuple(shape)
+        self.apply = apply
+        self.dtype = np.dtype(dtype)
+        self.diagonal_values = diagonal
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Computes the product with a flat array (into out, if given)
+    def matvec(self, x, out = None):
+        if out is None:
+            out = np.empty(self.shape[0], dtype=self.dtype)
+        self.apply(x, out)
+        return out
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Overload matmul ("@") operator (flat arrays or fields)
+    def __matmul__(self, x):
+        if isinstance(x, field_t):
+            return self.matvec(x.values)
+        return self.matvec(np.ravel(x))
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the diagonal of the operator (None if not known)
+    def diagonal(self):
+        return self.diagonal_values
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the operator as a scipy LinearOperator
+    def to_scipy(self):
+        if sparse_linalg is None:
+            print("ERROR: scipy is not available")
+            return None
+        return sparse_linalg.LinearOperator(self.shape, dtype=self.dtype, \
+                                            matvec=lambda x: self.matvec(np.ravel(x)))
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Returns an (assembled) sparse matrix as a linear operator; CSR products are
+# accumulated into out without temporaries when the scipy kernel is available
+# (and the arrays are contiguous, with the matrix dtype)
+def matrix_operator(matrix):
+    matrix = matrix.tocsr()
+    (num_rows, num_cols) = matrix.shape
+    def apply(x, out):
+        if csr_matvec is None or x.dtype != matrix.dtype or out.dtype != matrix.dtype or \
+           not x.flags.c_contiguous or not out.flags.c_contiguous:
+            out[...] = matrix @ x
+            return
+        out[...] = 0.0
+        csr_matvec(num_rows, num_cols, matrix.indptr, matrix.indices, matrix.data, x, out)
+    return linear_operator_t(matrix.shape, apply, matrix.dtype, matrix.diagonal())
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Returns a field at a mesh location whose values take no memory (a
+# zero-stride view), only used to wrap other arrays at that location
+def location_template(mesh, num_directions, orientation, dtype = None, boundary_conditions = None):
+    value_dtype = mesh.dtype if dtype is None else np.dtype(dtype)
+    values = np.broadcast_to(np.zeros(1, dtype=value_dtype), (mesh.tot_points[num_directions][orientation],))
+    return field_t(mesh, values, num_directions, orientation, halo_width=0, \
+                   boundary_conditions=boundary_conditions)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Returns the face fields wrapping consecutive parts of a flat array (face
+# values of each orientation stacked in order)
+def wrap_faces(faces, values):
+    wrapped = [None] * len(faces)
+    start = 0
+    for i in range(len(faces)):
+        wrapped[i] = faces[i].wrap(values[start:start + faces[i].tot_points])
+        start += faces[i].tot_points
+    return wrapped
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Returns the cell Laplacian as a matrix-free operator: its linear part, for
+# the given boundary conditions (the mesh ones by default) with zero values.
+# Only one cell array is stored (work space of the stencil).
+def laplacian_operator(mesh, boundary_conditions = None, dtype = None):
+    if boundary_conditions is None:
+        boundary_conditions = mesh.boundary_conditions
+    bcs = boundary_conditions.homogeneous()
+    template = field_t(mesh, 0.0, dtype=dtype, halo_width=0, boundary_conditions=bcs)
+    def apply(x, out):
+        laplacian(template.wrap(x), template.wrap(out), template.values)
+    return linear_operator_t((mesh.tot_cells, mesh.tot_cells), apply, template.dtype, \
+                             laplacian_diagonal(mesh, bcs))
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Computes the diagonal of the cell Laplacian, only correcting boundary cells
+def laplacian_diagonal(mesh, boundary_conditions):
+    diagonal = np.full(mesh.tot_cells, \
+                       -2.0 * sum([mesh.cell_faces_area[i] / (mesh.cell_size[i] * mesh.cell_volume) \
+                                   for i in range(mesh.num_dims)]))
+    for i in range(mesh.num_dims):
+        coeff = mesh.cell_faces_area[i] / (mesh.cell_size[i] * mesh.cell_volume)
+        for side in range(2):
+            bc = boundary_conditions.conditions[i][side]
+            if bc.kind != "periodic":
+                diagonal[mesh.boundary_indices(i, side)] += \
+                    coeff * bc.ghost_coefficients(mesh.cell_size[i])[0]
+    return diagonal
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Returns the gradient from the cells to the stacked faces as a matrix-free
+# operator (linear part, as laplacian_operator)
+def gradient_operator(mesh, boundary_conditions = None, dtype = None):
+    if boundary_conditions is None:
+        boundary_conditions = mesh.boundary_conditions
+    bcs = boundary_conditions.homogeneous()
+    template = location_template(mesh, 0, 0, dtype, bcs)
+    faces = [location_template(mesh, 1, i, dtype) for i in range(mesh.num_face_orientations)]
+    def apply(x, out):
+        gradient(template.wrap(x), wrap_faces(faces, out))
+    return linear_operator_t((sum(mesh.tot_faces), mesh.tot_cells), apply, template.dtype)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Returns the divergence from the stacked faces to the cells as a matrix-free
+# operator
+def divergence_operator(mesh, dtype = None):
+    template = field_t(mesh, 0.0, dtype=dtype, halo_width=0)
+    faces = [location_template(mesh, 1, i, dtype) for i in range(mesh.num_face_orientations)]
+    def apply(x, out):
+        divergence(wrap_faces(faces, x), template.wrap(out), template.values)
+    return linear_operator_t((mesh.tot_cells, sum(mesh.tot_faces)), apply, template.dtype)
@@ -0,0 +1,169 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+import sys
+sys.path.append('../')
+try:
+    import scipy.sparse as sparse
+except ImportError:
+    sparse = None
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Returns True if scipy is available (printing an error otherwise)
+def check_sparse():
+    if sparse is None:
+        print("ERROR: sparse operators require scipy")
+        return False
+    return True
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Key of the part of the boundary conditions entering the matrices (the
+# condition values only enter the affine part of the operators)
+def boundary_key(boundary_conditions):
+    return tuple(tuple((bc.kind, bc.alpha, bc.beta) for bc in sides) \
+                 for sides in boundary_conditions.conditions)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Returns, for each cell (in global index order), the global index of the
+# point of (faces, edges or corners) with the same local indices
+def cell_point_indices(mesh, num_directions, orientation):
+    strides = mesh.strides[num_directions][orientation]
+    terms = [np.arange(mesh.num_cells[i], dtype=mesh.index_dtype) * strides[i] \
+             for i in range(mesh.num_dims)]
+    index = np.zeros(mesh.num_cells, dtype=mesh.index_dtype)
+    for term in np.ix_(*terms):
+        np.add(index, term, out=index)
+    return np.ravel(index, order=mesh.array_order())
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Returns the cells whose values give the ghost values beyond the side of axis
+# and their coefficient: the opposite boundary layer for periodic conditions,
+# the boundary layer itself (mirrored) otherwise
+def ghost_cells(mesh, bc, axis, side):
+    if bc.kind == "periodic":
+        return (mesh.boundary_indices(axis, 1 - side), 1.0)
+    return (mesh.boundary_indices(axis, side), bc.ghost_coefficients(mesh.cell_size[axis])[0])
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Builds a CSR matrix from rows holding the same number of entries (columns
+# and values given as (num_rows, row_size) arrays, possibly with duplicates)
+def csr_from_rows(cols, vals, num_cols):
+    (num_rows, row_size) = cols.shape
+    indptr = np.arange(0, num_rows * row_size + 1, row_size, \
+                       dtype=np.int64 if num_rows * row_size > np.iinfo(np.int32).max else np.int32)
+    matrix = sparse.csr_matrix((vals.ravel(), cols.ravel(), indptr), shape=(num_rows, num_cols))
+    matrix.sum_duplicates()
+    return matrix
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Assembles the cell Laplacian (as operators.differential.laplacian) as a CSR
+# matrix, one row of 2 * num_dims + 1 entries per cell. For inhomogeneous
+# boundary conditions the operator is affine: its constant part is the
+# Laplacian of a zero field.
+def laplacian_matrix(mesh, boundary_conditions):
+    if not check_sparse():
+        return None
+    tot_cells = mesh.tot_cells
+    cols = np.empty((tot_cells, 2 * mesh.num_dims + 1), dtype=mesh.index_dtype)
+    vals = np.empty((tot_cells, 2 * mesh.num_dims + 1))
+    cols[:, 0] = np.arange(tot_cells, dtype=mesh.index_dtype)
+    vals[:, 0] = 0.0
+    for i in range(mesh.num_dims):
+        coeff = mesh.cell_faces_area[i] / (mesh.cell_size[i] * mesh.cell_volume)
+        vals[:, 0] -= 2.0 * coeff
+        for side in range(2):
+            j = 1 + 2 * i + side
+            bc = boundary_conditions.conditions[i][side]
+            (ghosts, ghost_coeff) = ghost_cells(mesh, bc, i, side)
+            boundary = mesh.boundary_indices(i, side)
+            cols[:, j] = mesh.neighbour_indices(i, side)
+            vals[:, j] = coeff
+            cols[boundary, j] = ghosts
+            vals[boundary, j] = coeff * ghost_coeff
+    return csr_from_rows(cols, vals, tot_cells)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Assembles the difference between the upper and lower face of each cell
+# along axis, times coeff, as a CSR matrix (cells x faces normal to axis)
+def face_difference_matrix(mesh, axis, coeff):
+    lower = cell_point_indices(mesh, 1, axis)
+    cols = np.stack((lower, lower + mesh.strides[1][axis][axis]), axis=1)
+    vals = np.empty(cols.shape)
+    vals[:, 0] = -coeff
+    vals[:, 1] = coeff
+    return csr_from_rows(cols, vals, mesh.tot_faces[axis])
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Assembles the gradient from the cells to the faces normal to axis (as
+# operators.differential.gradient) as a CSR matrix: minus the transposed face
+# differences, plus the ghost contributions to the boundary faces
+def gradient_axis_matrix(mesh, boundary_conditions, axis):
+    if not check_sparse():
+        return None
+    inv_dx = 1.0 / mesh.cell_size[axis]
+    rows = [None] * 2
+    cols = [None] * 2
+    vals = [None] * 2
+    for side in range(2):
+        bc = boundary_conditions.conditions[axis][side]
+        (ghosts, ghost_coeff) = ghost_cells(mesh, bc, axis, side)
+        rows[side] = mesh.boundary_indices(axis, side, 1, axis)
+        cols[side] = ghosts
+        vals[side] = np.full(ghosts.shape[0], (-inv_dx if side == 0 else inv_dx) * ghost_coeff)
+    ghost_matrix = sparse.coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), \
+                                     shape=(mesh.tot_faces[axis], mesh.tot_cells))
+    return (face_difference_matrix(mesh, axis, -inv_dx).T + ghost_matrix).tocsr()
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Assembles the gradient from the cells to all the faces (face values of each
+# orientation stacked in order) as a CSR matrix
+def gradient_matrix(mesh, boundary_conditions):
+    if not check_sparse():
+        return None
+    return sparse.vstack([gradient_axis_matrix(mesh, boundary_conditions, i) \
+                          for i in range(mesh.num_face_orientations)], format="csr")
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Assembles the divergence from the faces normal to axis to the cells (as
+# operators.differential.divergence) as a CSR matrix
+def divergence_axis_matrix(mesh, axis):
+    if not check_sparse():
+        return None
+    return face_difference_matrix(mesh, axis, mesh.cell_faces_area[axis] / mesh.cell_volume)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Assembles the divergence from all the faces (face values of each orientation
+# stacked in order) to the cells as a CSR matrix
+def divergence_matrix(mesh, boundary_conditions):
+    if not check_sparse():
+        return None
+    return sparse.hstack([divergence_axis_matrix(mesh, i) \
+                          for i in range(mesh.num_face_orientations)], format="csr")
+
+# Operator builders by name
+builders = {"laplacian": laplacian_matrix, \
+            "gradient": gradient_matrix, \
+            "divergence": divergence_matrix}
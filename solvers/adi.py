@@ -0,0 +1,220 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+import sys
+sys.path.append('../')
+from fields.field import field_t
+from tools.axis_slice import axis_slice
+from operators.differential import laplacian, work_view
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Precomputes the forward sweep of the Thomas algorithm for the tridiagonal
+# matrix with constant off-diagonals (sub, sup) and diagonal diag (1D array):
+# returns the modified super-diagonal and the inverse pivots
+def thomas_coefficients(sub, diag, sup):
+    num_points = diag.shape[0]
+    modified_sup = np.empty(num_points)
+    inv_pivots   = np.empty(num_points)
+    inv_pivots[0]   = 1.0 / diag[0]
+    modified_sup[0] = sup * inv_pivots[0]
+    for k in range(1, num_points):
+        inv_pivots[k]   = 1.0 / (diag[k] - sub * modified_sup[k - 1])
+        modified_sup[k] = sup * inv_pivots[k]
+    return (modified_sup, inv_pivots)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Solves in place the tridiagonal systems along axis of the structured array d
+# (all lines at once, one slab per step), given the coefficients computed by
+# thomas_coefficients; tmp is a slab buffer (one point along axis)
+def thomas(d, axis, sub, modified_sup, inv_pivots, tmp):
+    num_dims   = d.ndim
+    num_points = d.shape[axis]
+    slab = lambda k: d[axis_slice(num_dims, axis, slice(k, k + 1))]
+    np.multiply(slab(0), inv_pivots[0], out=slab(0))
+    for k in range(1, num_points):
+        d_k = slab(k)
+        np.multiply(slab(k - 1), sub, out=tmp)
+        np.subtract(d_k, tmp, out=d_k)
+        np.multiply(d_k, inv_pivots[k], out=d_k)
+    for k in range(num_points - 2, -1, -1):
+        d_k = slab(k)
+        np.multiply(slab(k + 1), modified_sup[k], out=tmp)
+        np.subtract(d_k, tmp, out=d_k)
+    return d
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class adi_diffusion_solver_t:
+    """Alternating direction implicit (Douglas) solver of the diffusion equation
+    du/dt = viscosity * laplacian(u) for cell fields: an explicit predictor
+    followed by one implicit tridiagonal solve per axis, batched over all the
+    lines of the structured view (cyclic solves on periodic axes)."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor: theta = 0.5 (second order) or 1 (first order, damping)
+    def __init__(self, mesh, viscosity, theta = 0.5, boundary_conditions = None, dtype = None):
+        self.mesh      = mesh
+        self.viscosity = viscosity
+        self.theta     = theta
+        self.dtype     = mesh.dtype if dtype is None else np.dtype(dtype)
+        if boundary_conditions is None:
+            boundary_conditions = mesh.boundary_conditions
+        self.boundary_conditions = boundary_conditions
+
+        # Workspaces: right hand side, Laplacian work space (also holding the
+        # one-dimensional Laplacians) and one slab buffer per axis
+        self.rhs  = field_t(mesh, 0.0, dtype=self.dtype, halo_width=0)
+        self.work = field_t(mesh, 0.0, dtype=self.dtype, halo_width=0)
+        self.slabs = [None] * mesh.num_dims
+        for i in range(mesh.num_dims):
+            shape = list(mesh.num_cells)
+            shape[i] = 1
+            self.slabs[i] = np.empty(shape, dtype=self.dtype, order=mesh.array_order())
+
+        # Tridiagonal coefficients of each axis, for the last time step used
+        # (see line_system)
+        self.systems = [(None, None)] * mesh.num_dims
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns True if both faces normal to axis are periodic
+    def is_periodic(self, axis):
+        return all([bc.kind == "periodic" for bc in self.boundary_conditions.conditions[axis]])
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Coefficients of the boundary ghost values along axis as multiples of the
+    # boundary cells (linear part of non-periodic conditions)
+    def ghost_coefficients(self, axis):
+        dx = self.mesh.cell_size[axis]
+        return [bc.ghost_coefficients(dx)[0] for bc in self.boundary_conditions.conditions[axis]]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the factorisation of I - r L_axis, with r = theta * dt *
+    # viscosity / dx^2 and L_axis the 1D second difference (with its linear
+    # boundary closure): (sub, modified super-diagonal, inverse pivots, and
+    # for periodic axes the Sherman-Morrison correction vector and factors).
+    # Only the factorisation for the last dt is kept (adaptive steps change
+    # dt at every step).
+    def line_system(self, axis, dt):
+        if self.systems[axis][0] != dt:
+            num_points = self.mesh.num_cells[axis]
+            r = self.theta * dt * self.viscosity / self.mesh.cell_size[axis] ** 2
+            diag = np.full(num_points, 1.0 + 2.0 * r)
+            if self.is_periodic(axis):
+                # Cyclic system: A = A' + w v^T, with w = (gamma, 0, ..., -r)
+                # and v = (1, 0, ..., -r / gamma)
+                gamma = -diag[0]
+                diag[0]  -= gamma
+                diag[-1] -= r * r / gamma
+                (modified_sup, inv_pivots) = thomas_coefficients(-r, diag, -r)
+                w = np.zeros(num_points)
+                w[0]  = gamma
+                w[-1] = -r
+                z = thomas(w, 0, -r, modified_sup, inv_pivots, np.empty(1))
+                v_last = -r / gamma
+                correction = (z, v_last, 1.0 / (1.0 + z[0] + v_last * z[-1]))
+            else:
+                (lower, upper) = self.ghost_coefficients(axis)
+                diag[0]  -= r * lower
+                diag[-1] -= r * upper
+                (modified_sup, inv_pivots) = thomas_coefficients(-r, diag, -r)
+                correction = None
+            self.systems[axis] = (dt, (-r, modified_sup, inv_pivots, correction))
+        return self.systems[axis][1]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Computes into out the 1D second difference of u along axis divided by
+    # dx^2, with the linear part of the boundary conditions
+    def axis_laplacian(self, u, out, axis):
+        num_dims = u.ndim
+        coeff = 1.0 / self.mesh.cell_size[axis] ** 2
+        inner = axis_slice(num_dims, axis, slice(1, -1))
+        first = axis_slice(num_dims, axis, slice(0, 1))
+        last  = axis_slice(num_dims, axis, slice(-1, None))
+        np.multiply(u, -2.0, out=out)
+        np.add(out[inner], u[axis_slice(num_dims, axis, slice(None, -2))], out=out[inner])
+        np.add(out[inner], u[axis_slice(num_dims, axis, slice(2, None))], out=out[inner])
+        np.add(out[first], u[axis_slice(num_dims, axis, slice(1, 2))], out=out[first])
+        np.add(out[last],  u[axis_slice(num_dims, axis, slice(-2, -1))], out=out[last])
+        if self.is_periodic(axis):
+            np.add(out[first], u[last], out=out[first])
+            np.add(out[last], u[first], out=out[last])
+        else:
+            (lower, upper) = self.ghost_coefficients(axis)
+            tmp = self.slabs[axis]
+            np.multiply(u[first], lower, out=tmp)
+            np.add(out[first], tmp, out=out[first])
+            np.multiply(u[last], upper, out=tmp)
+            np.add(out[last], tmp, out=out[last])
+        np.multiply(out, coeff, out=out)
+        return out
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Solves in place (I - r L_axis) x = d along axis for all the lines (the
+    # start of the work field is used as temporary on periodic axes)
+    def solve_lines(self, d, axis, dt):
+        (sub, modified_sup, inv_pivots, correction) = self.line_system(axis, dt)
+        thomas(d, axis, sub, modified_sup, inv_pivots, self.slabs[axis])
+        if correction is not None:
+            # Sherman-Morrison: x = y - z (v . y) / (1 + v . z)
+            (z, v_last, factor) = correction
+            num_dims = d.ndim
+            first = d[axis_slice(num_dims, axis, slice(0, 1))]
+            last  = d[axis_slice(num_dims, axis, slice(-1, None))]
+            scale = self.slabs[axis]
+            tmp   = work_view(self.work.values, scale.shape, self.mesh.array_order())
+            np.multiply(last, v_last * factor, out=scale)
+            np.multiply(first, factor, out=tmp)
+            np.add(scale, tmp, out=scale)
+            for k in range(d.shape[axis]):
+                d_k = d[axis_slice(num_dims, axis, slice(k, k + 1))]
+                np.multiply(scale, z[k], out=tmp)
+                np.subtract(d_k, tmp, out=d_k)
+        return d
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Advances the cell field u (in place) by dt:
+    #   v_0 = u + dt * viscosity * laplacian(u)
+    #   (I - theta dt viscosity L_i) v_i = v_(i-1) - theta dt viscosity L_i u
+    # for each axis i, and u = v_(num_dims)
+    def step(self, u, dt):
+        if u.num_directions != 0:
+            print("ERROR: the ADI solver requires a cell field (num_directions = ", \
+                  u.num_directions, ")")
+            return None
+        field = u if u.boundary_conditions is self.boundary_conditions else u.wrap(u.values)
+        field.boundary_conditions = self.boundary_conditions
+        rhs  = self.rhs.view
+        work = self.work.view
+        laplacian(field, self.rhs, self.work.values)
+        np.multiply(rhs, dt * self.viscosity, out=rhs)
+        np.add(rhs, u.view, out=rhs)
+        for i in range(self.mesh.num_dims):
+            self.axis_laplacian(u.view, work, i)
+            np.multiply(work, self.theta * dt * self.viscosity, out=work)
+            np.subtract(rhs, work, out=rhs)
+            self.solve_lines(rhs, i, dt)
+        u.view[...] = self.rhs.view
+        return u
@@ -0,0 +1,86 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+import sys
+sys.path.append('../')
+from fields.field import field_t
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class fft_poisson_solver_t:
+    """A Poisson solver for cell fields on fully periodic meshes, inverting the
+    discrete Laplacian in Fourier space."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor: builds the inverse eigenvalues of the Laplacian and the
+    # spectrum workspace once, to be reused by every solve
+    def __init__(self, mesh, dtype = None):
+        self.mesh  = mesh
+        self.dtype = mesh.dtype if dtype is None else np.dtype(dtype)
+        self.shape = tuple(mesh.num_cells)
+        self.inverse_eigenvalues = None
+        self.spectrum = None
+        if not all([mesh.is_periodic[i][0] and mesh.is_periodic[i][1] for i in range(mesh.num_dims)]):
+            print("ERROR: the FFT Poisson solver requires a fully periodic mesh")
+            return
+        # Eigenvalues of the 1D second differences (the real transform halves
+        # the last axis), summed over the axes by broadcasting
+        eigenvalues = [None] * mesh.num_dims
+        for i in range(mesh.num_dims):
+            if i == mesh.num_dims - 1:
+                modes = np.arange(mesh.num_cells[i] // 2 + 1)
+            else:
+                modes = np.arange(mesh.num_cells[i])
+            eigenvalues[i] = (2.0 * np.cos(2.0 * np.pi * modes / mesh.num_cells[i]) - 2.0) \
+                             / mesh.cell_size[i] ** 2
+        spectrum_shape = [len(e) for e in eigenvalues]
+        inverse = np.zeros(spectrum_shape, dtype=self.dtype)
+        for e in np.ix_(*eigenvalues):
+            np.add(inverse, e, out=inverse)
+        # The constant mode is set to zero (the solution has zero mean)
+        inverse.flat[0] = np.inf
+        np.divide(1.0, inverse, out=inverse)
+        self.inverse_eigenvalues = inverse
+        complex_dtype = np.result_type(self.dtype, np.complex64)
+        self.spectrum = np.empty(spectrum_shape, dtype=complex_dtype, order=mesh.array_order())
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Solves laplacian(out) = rhs (cell fields), writing into out if given;
+    # the mean of rhs is ignored and the solution has zero mean
+    def solve(self, rhs, out = None):
+        if self.inverse_eigenvalues is None:
+            print("ERROR: the FFT Poisson solver was not initialised")
+            return None
+        if rhs.num_directions != 0:
+            print("ERROR: the FFT Poisson solver requires a cell field (num_directions = ", \
+                  rhs.num_directions, ")")
+            return None
+        if out is None:
+            out = field_t(self.mesh, 0.0, dtype=self.dtype)
+        np.fft.rfftn(rhs.view, out=self.spectrum)
+        np.multiply(self.spectrum, self.inverse_eigenvalues, out=self.spectrum)
+        np.fft.irfftn(self.spectrum, s=self.shape, out=out.view)
+        return out
@@ -0,0 +1,250 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+import math
+import sys
+sys.path.append('../')
+from fields.field import field_t
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class krylov_solver_t:
+    """Preconditioned Krylov solvers (CG, BiCGSTAB, restarted GMRES) of A x = b
+    on the flat values of fields, using a fixed pool of work arrays."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor
+    #   - operator: object with shape, dtype and matvec(x, out) (for example an
+    #     operators.linear_operators.linear_operator_t)
+    #   - method: "cg" (symmetric definite operators), "bicgstab" or "gmres"
+    #   - preconditioner: object with apply(r, z) (see solvers.preconditioners),
+    #     applied on the left for CG and on the right otherwise
+    #   - restart: Krylov subspace size of GMRES
+    def __init__(self, operator, method = "cg", preconditioner = None, restart = 30):
+        self.operator       = operator
+        self.method         = method
+        self.preconditioner = preconditioner
+        self.restart        = restart
+        self.residual_history = []
+        self.num_iterations   = 0
+        self.converged        = False
+        if method not in ("cg", "bicgstab", "gmres"):
+            print("ERROR: unknown Krylov method: ", method)
+
+        # Work pool, allocated once
+        num_work = {"cg": 5, "bicgstab": 8, "gmres": 2}.get(method, 0)
+        size = operator.shape[0]
+        self.work = [np.empty(size, dtype=operator.dtype) for i in range(num_work)]
+        if method == "gmres":
+            self.basis = [np.empty(size, dtype=operator.dtype) for i in range(restart + 1)]
+            if preconditioner is None:
+                self.preconditioned_basis = self.basis
+            else:
+                self.preconditioned_basis = [np.empty(size, dtype=operator.dtype) for i in range(restart)]
+            self.hessenberg = np.zeros((restart + 1, restart))
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Solves A x = rhs (fields or flat arrays), writing into out (also the
+    # initial guess, zero if not given) until the residual norm relative to
+    # the norm of rhs is below tol or max_iterations are done. The relative
+    # residual norms are recorded in residual_history. Fields with ghost
+    # layers are solved through flat copies of their values.
+    def solve(self, rhs, out = None, tol = 1e-8, max_iterations = 1000):
+        b = rhs.flat_values() if isinstance(rhs, field_t) else rhs
+        if out is None:
+            out = rhs.wrap(np.zeros_like(b)) if isinstance(rhs, field_t) else np.zeros_like(b)
+        x = out.flat_values() if isinstance(out, field_t) else out
+        b_norm = norm(b)
+        if b_norm == 0.0:
+            b_norm = 1.0
+        self.residual_history = []
+        self.num_iterations   = 0
+        self.converged        = False
+        if self.method == "cg":
+            self.cg(b, x, b_norm, tol, max_iterations)
+        elif self.method == "bicgstab":
+            self.bicgstab(b, x, b_norm, tol, max_iterations)
+        elif self.method == "gmres":
+            self.gmres(b, x, b_norm, tol, max_iterations)
+        if isinstance(out, field_t) and out.padded is not None:
+            out[...] = x
+        return out
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Applies the preconditioner (the identity if there is none)
+    def precondition(self, r, z):
+        if self.preconditioner is None:
+            z[...] = r
+        else:
+            self.preconditioner.apply(r, z)
+        return z
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Records a relative residual norm, returning True on convergence
+    def record(self, residual_norm, b_norm, tol):
+        self.residual_history.append(residual_norm / b_norm)
+        self.converged = self.residual_history[-1] <= tol
+        return self.converged
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Preconditioned conjugate gradient
+    def cg(self, b, x, b_norm, tol, max_iterations):
+        (r, z, p, q, tmp) = self.work
+        self.operator.matvec(x, q)
+        np.subtract(b, q, out=r)
+        if self.record(norm(r), b_norm, tol):
+            return
+        self.precondition(r, z)
+        p[...] = z
+        rz = np.dot(r, z)
+        for k in range(max_iterations):
+            self.operator.matvec(p, q)
+            alpha = rz / np.dot(p, q)
+            axpy(alpha, p, x, tmp)
+            axpy(-alpha, q, r, tmp)
+            self.num_iterations += 1
+            if self.record(norm(r), b_norm, tol):
+                return
+            self.precondition(r, z)
+            rz_new = np.dot(r, z)
+            # p = z + beta * p
+            np.multiply(p, rz_new / rz, out=p)
+            np.add(p, z, out=p)
+            rz = rz_new
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Right-preconditioned stabilised biconjugate gradient
+    def bicgstab(self, b, x, b_norm, tol, max_iterations):
+        (r, r_hat, p, v, p_hat, s_hat, t, tmp) = self.work
+        self.operator.matvec(x, t)
+        np.subtract(b, t, out=r)
+        if self.record(norm(r), b_norm, tol):
+            return
+        r_hat[...] = r
+        p[...] = 0.0
+        v[...] = 0.0
+        (rho, alpha, omega) = (1.0, 1.0, 1.0)
+        for k in range(max_iterations):
+            rho_new = np.dot(r_hat, r)
+            if rho_new == 0.0:
+                print("ERROR: BiCGSTAB breakdown (rho = 0)")
+                return
+            beta = (rho_new / rho) * (alpha / omega)
+            # p = r + beta * (p - omega * v)
+            axpy(-omega, v, p, tmp)
+            np.multiply(p, beta, out=p)
+            np.add(p, r, out=p)
+            self.precondition(p, p_hat)
+            self.operator.matvec(p_hat, v)
+            alpha = rho_new / np.dot(r_hat, v)
+            # s = r - alpha * v (stored in r)
+            axpy(-alpha, v, r, tmp)
+            self.num_iterations += 1
+            if norm(r) / b_norm <= tol:
+                axpy(alpha, p_hat, x, tmp)
+                self.record(norm(r), b_norm, tol)
+                return
+            self.precondition(r, s_hat)
+            self.operator.matvec(s_hat, t)
+            tt = np.dot(t, t)
+            omega = np.dot(t, r) / tt if tt > 0.0 else 0.0
+            axpy(alpha, p_hat, x, tmp)
+            axpy(omega, s_hat, x, tmp)
+            axpy(-omega, t, r, tmp)
+            rho = rho_new
+            if self.record(norm(r), b_norm, tol):
+                return
+            if omega == 0.0:
+                print("ERROR: BiCGSTAB breakdown (omega = 0)")
+                return
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Restarted flexible GMRES (right preconditioned, modified Gram-Schmidt
+    # orthogonalisation and Givens rotations)
+    def gmres(self, b, x, b_norm, tol, max_iterations):
+        (r, tmp) = self.work
+        V = self.basis
+        Z = self.preconditioned_basis
+        H = self.hessenberg
+        m = self.restart
+        cs = np.zeros(m)
+        sn = np.zeros(m)
+        g  = np.zeros(m + 1)
+        self.operator.matvec(x, r)
+        np.subtract(b, r, out=r)
+        beta = norm(r)
+        if self.record(beta, b_norm, tol):
+            return
+        while self.num_iterations < max_iterations:
+            np.multiply(r, 1.0 / beta, out=V[0])
+            H[...] = 0.0
+            g[...] = 0.0
+            g[0]   = beta
+            for j in range(m):
+                if Z is not V:
+                    self.preconditioner.apply(V[j], Z[j])
+                w = V[j + 1]
+                self.operator.matvec(Z[j], w)
+                for i in range(j + 1):
+                    H[i, j] = np.dot(w, V[i])
+                    axpy(-H[i, j], V[i], w, tmp)
+                H[j + 1, j] = norm(w)
+                if H[j + 1, j] > 0.0:
+                    np.multiply(w, 1.0 / H[j + 1, j], out=w)
+                # Applies the previous rotations and computes the new one
+                for i in range(j):
+                    (H[i, j], H[i + 1, j]) = (cs[i] * H[i, j] + sn[i] * H[i + 1, j], \
+                                              -sn[i] * H[i, j] + cs[i] * H[i + 1, j])
+                denominator = math.hypot(H[j, j], H[j + 1, j])
+                cs[j] = H[j, j] / denominator
+                sn[j] = H[j + 1, j] / denominator
+                H[j, j] = denominator
+                H[j + 1, j] = 0.0
+                g[j + 1] = -sn[j] * g[j]
+                g[j]     =  cs[j] * g[j]
+                self.num_iterations += 1
+                if self.record(abs(g[j + 1]), b_norm, tol) or self.num_iterations >= max_iterations:
+                    break
+            # Updates the solution with the (preconditioned) basis
+            y = np.linalg.solve(np.triu(H[:j + 1, :j + 1]), g[:j + 1])
+            for i in range(j + 1):
+                axpy(y[i], Z[i], x, tmp)
+            if self.converged:
+                return
+            self.operator.matvec(x, r)
+            np.subtract(b, r, out=r)
+            beta = norm(r)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Euclidean norm of a flat array (no temporaries)
+def norm(x):
+    return math.sqrt(np.dot(x, x))
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Computes y += a * x in place (tmp holds a * x)
+def axpy(a, x, y, tmp):
+    np.multiply(x, a, out=tmp)
+    np.add(y, tmp, out=y)
@@ -0,0 +1,365 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+import itertools
+import math
+import sys
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from fields.field import field_t
+from tools.axis_slice import axis_slice
+from operators.differential import laplacian, work_view
+from operators.linear_operators import laplacian_operator, laplacian_diagonal
+from solvers.krylov import krylov_solver_t
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class multigrid_level_t:
+    """The mesh, fields and workspaces of one level of a multigrid hierarchy."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor
+    def __init__(self, mesh, boundary_conditions, dtype):
+        self.mesh = mesh
+        self.boundary_conditions = boundary_conditions
+
+        # Solution (correction on coarse levels), right hand side and residual
+        self.u = field_t(mesh, 0.0, dtype=dtype, halo_width=0, boundary_conditions=boundary_conditions)
+        self.f = field_t(mesh, 0.0, dtype=dtype, halo_width=0, boundary_conditions=boundary_conditions)
+        self.r = field_t(mesh, 0.0, dtype=dtype, halo_width=0, boundary_conditions=boundary_conditions)
+        # Work space of the Laplacian
+        self.work = np.empty(mesh.tot_cells, dtype=dtype)
+
+        # Inverse diagonal of the Laplacian
+        self.inv_diagonal = (1.0 / laplacian_diagonal(mesh, boundary_conditions)).astype(dtype)
+
+        # Parity offsets of the strided sub-lattices of the red and black
+        # cells (sum of the local indices even or odd)
+        self.colours = ([], [])
+        for offsets in itertools.product((0, 1), repeat=mesh.num_dims):
+            self.colours[sum(offsets) % 2].append(offsets)
+
+        # Buffers of the prolongation from the next coarser level (allocated
+        # when the hierarchy is built)
+        self.prolongation_buffers = None
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class multigrid_solver_t:
+    """A geometric multigrid solver of the Poisson problem laplacian(u) = f on
+    the cells, over a hierarchy of meshes coarsened by halving num_cells."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor
+    #   - cycle: "V", "W" or "F"
+    #   - smoother: "rbgs" (red-black Gauss-Seidel) or "jacobi" (weighted)
+    #   - max_coarse_cells: the hierarchy is coarsened until a level has at
+    #     most this number of cells (or cannot be halved further); the
+    #     coarsest level is solved directly if it is that small, otherwise by
+    #     conjugate gradients down to coarse_tol
+    def __init__(self, mesh, boundary_conditions = None, cycle = "V", smoother = "rbgs", \
+                 num_pre = 2, num_post = 2, max_coarse_cells = 64, coarse_tol = 1e-10, dtype = None):
+        self.cycle    = cycle
+        self.smoother = smoother
+        self.num_pre  = num_pre
+        self.num_post = num_post
+        self.dtype    = mesh.dtype if dtype is None else np.dtype(dtype)
+        self.omega    = 2.0 / 3.0
+        self.residual_history = []
+        if cycle not in ("V", "W", "F"):
+            print("ERROR: unknown multigrid cycle: ", cycle)
+        if smoother not in ("rbgs", "jacobi"):
+            print("ERROR: unknown multigrid smoother: ", smoother)
+        if boundary_conditions is None:
+            boundary_conditions = mesh.boundary_conditions
+
+        # Without Dirichlet or Robin faces the solution is defined up to a constant
+        self.singular = all([bc.kind == "periodic" or bc.alpha == 0.0 \
+                             for sides in boundary_conditions.conditions for bc in sides])
+
+        # Builds the hierarchy (coarse levels solve for homogeneous corrections)
+        homogeneous = boundary_conditions.homogeneous()
+        conditions  = [bc for sides in homogeneous.conditions for bc in sides]
+        domain      = [x for limits in mesh.domain for x in limits]
+        is_periodic = [p for sides in mesh.is_periodic for p in sides]
+        self.levels = [multigrid_level_t(mesh, boundary_conditions, self.dtype)]
+        self.finest_homogeneous = None
+        num_cells = list(mesh.num_cells)
+        while math.prod(num_cells) > max_coarse_cells and \
+              all([n % 2 == 0 and n >= 4 for n in num_cells]):
+            num_cells = [n // 2 for n in num_cells]
+            coarse = cartesian_mesh_t(domain, num_cells, is_periodic, self.dtype, \
+                                      boundary_conditions = conditions)
+            self.levels.append(multigrid_level_t(coarse, coarse.boundary_conditions, self.dtype))
+        for l in range(len(self.levels) - 1):
+            self.levels[l].prolongation_buffers = prolongation_buffers(self.levels[l + 1].mesh, self.dtype)
+
+        # Pseudo-inverse of the coarsest Laplacian (built column by column) if
+        # it is small, otherwise a conjugate gradient solver (odd num_cells
+        # stop the coarsening early)
+        coarsest = self.levels[-1]
+        operator = laplacian_operator(coarsest.mesh, coarsest.boundary_conditions, self.dtype)
+        self.coarse_tol     = coarse_tol
+        self.coarse_inverse = None
+        self.coarse_solver  = None
+        if coarsest.mesh.tot_cells <= max_coarse_cells:
+            identity = np.eye(coarsest.mesh.tot_cells, dtype=self.dtype)
+            matrix   = np.empty((coarsest.mesh.tot_cells, coarsest.mesh.tot_cells), dtype=self.dtype)
+            for j in range(coarsest.mesh.tot_cells):
+                operator.matvec(identity[j], matrix[:, j])
+            self.coarse_inverse = np.linalg.pinv(matrix)
+        else:
+            self.coarse_solver = krylov_solver_t(operator, "cg")
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Computes the residual r = f - laplacian(u) on a level
+    def residual(self, level):
+        laplacian(level.u, level.r, level.work)
+        np.subtract(level.f.values, level.r.values, out=level.r.values)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Applies num_sweeps smoothing sweeps on a level; red-black sweeps go red
+    # then black, or black then red if reverse (post-smoothing, so that the
+    # cycle is symmetric)
+    def smooth(self, level, num_sweeps, reverse = False):
+        u = level.u.values
+        r = level.r.values
+        colours = (1, 0) if reverse else (0, 1)
+        for s in range(num_sweeps):
+            if self.smoother == "jacobi":
+                self.residual(level)
+                np.multiply(r, level.inv_diagonal, out=r)
+                np.multiply(r, self.omega, out=r)
+                np.add(u, r, out=u)
+            else:
+                for colour in colours:
+                    self.relax_colour(level, colour)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Gauss-Seidel update of the cells of one colour (0 red, 1 black), which do
+    # not depend on each other: the residual is only evaluated on those cells,
+    # one strided sub-lattice at a time (every smoothed level has an even
+    # number of cells along each axis, so that the sub-lattices have the same
+    # shape), with the ghost layers of the boundary conditions at the
+    # boundaries
+    def relax_colour(self, level, colour):
+        mesh     = level.mesh
+        num_dims = mesh.num_dims
+        order    = mesh.array_order()
+        u = level.u.view
+        f = level.f.view
+        inv_diagonal = level.inv_diagonal.reshape(mesh.num_cells, order=order)
+        coeffs = [mesh.cell_faces_area[i] / (mesh.cell_size[i] * mesh.cell_volume) \
+                  for i in range(num_dims)]
+        shape = tuple(n // 2 for n in mesh.num_cells)
+        size  = math.prod(shape)
+        r   = work_view(level.work[:size], shape, order)
+        tmp = work_view(level.work[size:2 * size], shape, order)
+        ghosts = [level.u.ghost_layers(i) for i in range(num_dims)]
+        for offsets in level.colours[colour]:
+            cells = tuple(slice(o, None, 2) for o in offsets)
+            # Sum of the neighbours along each axis (the sub-lattice with the
+            # other parity along i, and the same one shifted towards the
+            # boundary ghost layer), weighted by the axis coefficient
+            for i in range(num_dims):
+                index = list(cells)
+                index[i] = slice(1 - offsets[i], None, 2)
+                neighbour = u[tuple(index)]
+                index[i] = slice(None)
+                ghost = ghosts[i][offsets[i]][tuple(index)]
+                if offsets[i] == 0:
+                    (inner, outer, edge) = (slice(1, None), slice(None, -1), slice(0, 1))
+                else:
+                    (inner, outer, edge) = (slice(None, -1), slice(1, None), slice(-1, None))
+                (inner, outer, edge) = [axis_slice(num_dims, i, sl) for sl in (inner, outer, edge)]
+                w = r if i == 0 else tmp
+                np.add(neighbour[inner], neighbour[outer], out=w[inner])
+                np.add(neighbour[edge], ghost, out=w[edge])
+                np.multiply(w, coeffs[i], out=w)
+                if i > 0:
+                    np.add(r, w, out=r)
+            # u += (f - laplacian(u)) / diagonal on the sub-lattice
+            u_c = u[cells]
+            np.subtract(f[cells], r, out=r)
+            np.multiply(u_c, 2.0 * sum(coeffs), out=tmp)
+            np.add(r, tmp, out=r)
+            np.multiply(r, inv_diagonal[cells], out=r)
+            np.add(u_c, r, out=u_c)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Solves the coarsest level, correcting its solution by the inverse of the
+    # linear part applied to the residual (the coarsest level is the finest
+    # one, with its boundary conditions, when the mesh cannot be coarsened)
+    def solve_coarsest(self, level):
+        self.residual(level)
+        correction = level.work
+        if self.coarse_inverse is not None:
+            np.dot(self.coarse_inverse, level.r.values, out=correction)
+        else:
+            correction[...] = 0.0
+            self.coarse_solver.solve(level.r.values, correction, tol=self.coarse_tol, \
+                                     max_iterations=level.mesh.tot_cells)
+        np.add(level.u.values, correction, out=level.u.values)
+        if self.singular:
+            level.u.values -= np.mean(level.u.values)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Applies a cycle on level l (the solution of level l as initial guess),
+    # or on the given finest level
+    def apply_cycle(self, l, cycle, level = None):
+        if level is None:
+            level = self.levels[l]
+        if l == len(self.levels) - 1:
+            self.solve_coarsest(level)
+            return
+        coarse = self.levels[l + 1]
+        self.smooth(level, self.num_pre)
+        self.residual(level)
+        restrict(level.r.view, coarse.f.view)
+        coarse.u.values[...] = 0.0
+        if cycle == "V":
+            self.apply_cycle(l + 1, "V")
+        elif cycle == "W":
+            self.apply_cycle(l + 1, "W")
+            self.apply_cycle(l + 1, "W")
+        else:
+            self.apply_cycle(l + 1, "F")
+            self.apply_cycle(l + 1, "V")
+        prolong(coarse, level.prolongation_buffers, level.u.view)
+        self.smooth(level, self.num_post, reverse=True)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Solves laplacian(out) = rhs (cell fields), writing into out (also the
+    # initial guess) if given, until the residual norm is reduced by tol or
+    # max_cycles cycles are applied. The relative residual norms are recorded
+    # in residual_history.
+    def solve(self, rhs, out = None, tol = 1e-8, max_cycles = 50):
+        if out is None:
+            out = field_t(self.levels[0].mesh, 0.0, dtype=self.dtype)
+        finest = self.levels[0]
+        finest.f.view[...] = rhs.view
+        if self.singular:
+            finest.f.values -= np.mean(finest.f.values)
+        finest.u.view[...] = out.view
+        rhs_norm = np.linalg.norm(finest.f.values)
+        if rhs_norm == 0.0:
+            rhs_norm = 1.0
+        self.residual(finest)
+        self.residual_history = [np.linalg.norm(finest.r.values) / rhs_norm]
+        for c in range(max_cycles):
+            if self.residual_history[-1] <= tol:
+                break
+            self.apply_cycle(0, self.cycle)
+            if self.singular:
+                finest.u.values -= np.mean(finest.u.values)
+            self.residual(finest)
+            self.residual_history.append(np.linalg.norm(finest.r.values) / rhs_norm)
+        out.view[...] = finest.u.view
+        return out
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the finest level with homogeneous boundary conditions (the
+    # finest level itself if its conditions are, otherwise a copy built on
+    # first use, sharing the prolongation buffers)
+    def homogeneous_level(self):
+        if self.finest_homogeneous is None:
+            finest = self.levels[0]
+            conditions = finest.boundary_conditions
+            if all([np.all(bc.value == 0.0) for sides in conditions.conditions for bc in sides]):
+                self.finest_homogeneous = finest
+            else:
+                self.finest_homogeneous = multigrid_level_t(finest.mesh, conditions.homogeneous(), self.dtype)
+                self.finest_homogeneous.prolongation_buffers = finest.prolongation_buffers
+        return self.finest_homogeneous
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Applies one cycle from a zero initial guess to the flat array r, writing
+    # the approximate solution into z (use as a preconditioner: the cycle
+    # runs with homogeneous boundary conditions, so that it is linear in r)
+    def precondition(self, r, z):
+        finest = self.homogeneous_level()
+        finest.f.values[...] = r
+        finest.u.values[...] = 0.0
+        self.apply_cycle(0, self.cycle, finest)
+        z[...] = finest.u.values
+        return z
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Restricts a fine cell array to the coarse cells, averaging the 2^num_dims
+# children of each coarse cell (strided views, no temporaries)
+def restrict(fine, coarse):
+    num_dims = fine.ndim
+    coarse[...] = 0.0
+    for offsets in itertools.product((0, 1), repeat=num_dims):
+        np.add(coarse, fine[tuple(slice(o, None, 2) for o in offsets)], out=coarse)
+    np.multiply(coarse, 1.0 / 2 ** num_dims, out=coarse)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Allocates the arrays holding a coarse cell array refined along the first
+# 1, 2, ..., num_dims axes
+def prolongation_buffers(coarse_mesh, dtype):
+    shape   = list(coarse_mesh.num_cells)
+    buffers = [None] * coarse_mesh.num_dims
+    for i in range(coarse_mesh.num_dims):
+        shape[i] *= 2
+        buffers[i] = np.empty(shape, dtype=dtype, order=coarse_mesh.array_order())
+    return buffers
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Prolongs the coarse correction (level.u) by linear interpolation, one axis at
+# a time, and adds it to the fine array. Children lie a quarter of a coarse cell
+# from the coarse centre: each takes 3/4 of its parent and 1/4 of the nearest
+# neighbour, boundary neighbours being the ghost values of the homogeneous
+# boundary conditions.
+def prolong(level, buffers, fine):
+    mesh = level.mesh
+    src  = level.u.view
+    for i in range(mesh.num_dims):
+        dst   = buffers[i]
+        even  = dst[axis_slice(mesh.num_dims, i, slice(0, None, 2))]
+        odd   = dst[axis_slice(mesh.num_dims, i, slice(1, None, 2))]
+        first = axis_slice(mesh.num_dims, i, slice(0, 1))
+        last  = axis_slice(mesh.num_dims, i, slice(-1, None))
+        # Differences with the neighbours (ghosts at the boundaries)
+        np.subtract(src[axis_slice(mesh.num_dims, i, slice(None, -1))], \
+                    src[axis_slice(mesh.num_dims, i, slice(1, None))], \
+                    out=even[axis_slice(mesh.num_dims, i, slice(1, None))])
+        np.negative(even[axis_slice(mesh.num_dims, i, slice(1, None))], \
+                    out=odd[axis_slice(mesh.num_dims, i, slice(None, -1))])
+        (lower, upper) = level.boundary_conditions.conditions[i]
+        if lower.kind == "periodic":
+            np.subtract(src[last], src[first], out=even[first])
+        else:
+            np.multiply(src[first], lower.ghost_coefficients(mesh.cell_size[i])[0] - 1.0, out=even[first])
+        if upper.kind == "periodic":
+            np.subtract(src[first], src[last], out=odd[last])
+        else:
+            np.multiply(src[last], upper.ghost_coefficients(mesh.cell_size[i])[0] - 1.0, out=odd[last])
+        np.multiply(dst, 0.25, out=dst)
+        np.add(even, src, out=even)
+        np.add(odd,  src, out=odd)
+        src = dst
+    np.add(fine, src, out=fine)
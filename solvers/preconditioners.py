@@ -0,0 +1,126 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+import sys
+sys.path.append('../')
+try:
+    import scipy.sparse as sparse
+    import scipy.sparse.linalg as sparse_linalg
+except ImportError:
+    sparse = None
+    sparse_linalg = None
+
+# A preconditioner approximates the inverse of an operator: apply(r, z) writes
+# the approximate solution of A z = r (flat arrays) into z. The Jacobi and
+# multigrid ones do not allocate; the SSOR and ILU ones go through SuperLU
+# triangular solves, which return one new array per solve.
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class jacobi_preconditioner_t:
+    """Jacobi (diagonal) preconditioner of a linear operator or sparse matrix."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor
+    def __init__(self, operator):
+        self.inv_diagonal = 1.0 / operator.diagonal()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Applies the preconditioner
+    def apply(self, r, z):
+        np.multiply(r, self.inv_diagonal, out=z)
+        return z
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class ssor_preconditioner_t:
+    """Symmetric successive over-relaxation preconditioner of a sparse matrix:
+    (D/omega + L) (omega/(2-omega) D^-1) (D/omega + U) with forward and backward
+    triangular solves."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor (the triangular factors are set up once, in their natural
+    # order and without pivoting, so that they get no fill-in)
+    def __init__(self, matrix, omega = 1.0):
+        if sparse is None:
+            print("ERROR: the SSOR preconditioner requires scipy")
+            return
+        matrix = sparse.csr_matrix(matrix)
+        diagonal = matrix.diagonal()
+        lower = (sparse.tril(matrix, -1) + sparse.diags(diagonal / omega)).tocsc()
+        upper = (sparse.triu(matrix, 1) + sparse.diags(diagonal / omega)).tocsc()
+        self.lower = sparse_linalg.splu(lower, permc_spec="NATURAL", diag_pivot_thresh=0.0, \
+                                        options=dict(SymmetricMode=True))
+        self.upper = sparse_linalg.splu(upper, permc_spec="NATURAL", diag_pivot_thresh=0.0, \
+                                        options=dict(SymmetricMode=True))
+        self.scale = diagonal * (2.0 - omega) / omega
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Applies the preconditioner
+    def apply(self, r, z):
+        y = self.lower.solve(r)
+        np.multiply(y, self.scale, out=y)
+        z[...] = self.upper.solve(y)
+        return z
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class ilu_preconditioner_t:
+    """Incomplete LU factorisation preconditioner of a sparse matrix (for
+    example the cached mesh operators)."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor (the factorisation is computed once)
+    def __init__(self, matrix, drop_tol = 1e-4, fill_factor = 10.0):
+        if sparse is None:
+            print("ERROR: the ILU preconditioner requires scipy")
+            return
+        self.factors = sparse_linalg.spilu(sparse.csc_matrix(matrix), drop_tol=drop_tol, \
+                                           fill_factor=fill_factor)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Applies the preconditioner
+    def apply(self, r, z):
+        z[...] = self.factors.solve(r)
+        return z
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class multigrid_preconditioner_t:
+    """One multigrid cycle (solvers.multigrid) as a preconditioner of the cell
+    Laplacian with homogeneous boundary conditions."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor (the finest level with homogeneous conditions is built here
+    # if the solver has inhomogeneous ones, so that the cycle stays linear)
+    def __init__(self, solver):
+        self.solver = solver
+        self.solver.homogeneous_level()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Applies the preconditioner
+    def apply(self, r, z):
+        return self.solver.precondition(r, z)
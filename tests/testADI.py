@@ -0,0 +1,98 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+#
+# --------------------------------------------------------------------------- #
+#!/usr/bin/env python3
+# Modules
+import time
+import sys
+import numpy as np
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from mesh.boundary_conditions import dirichlet
+from fields.field import field_t
+from solvers.adi import adi_diffusion_solver_t
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Parameters
+verbose = False
+
+# 2D mesh size
+Nx_2D = 1024
+Ny_2D = 1024
+
+#3D mesh size
+Nx_3D = 256
+Ny_3D = 256
+Nz_3D = 256
+
+# Discrete eigenfunctions of the Laplacian (Dirichlet along x, periodic along y
+# and z) and their decay rates
+k = 2.0 * np.pi
+def f2D(xx):
+    return np.sin(0.5 * k * xx[0]) * np.cos(k * xx[1])
+def f3D(xx):
+    return np.sin(0.5 * k * xx[0]) * np.cos(k * xx[1]) * np.sin(k * xx[2])
+def decay_rate(mesh):
+    wavenumbers = [0.5 * k] + [k] * (mesh.num_dims - 1)
+    return sum([(2.0 - 2.0 * np.cos(wavenumbers[i] * mesh.cell_size[i])) / mesh.cell_size[i] ** 2 \
+                for i in range(mesh.num_dims)])
+
+# Viscosity and final time
+viscosity = 0.01
+t_end     = 1.0
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test 2D convergence in time (steps far beyond the explicit stability limit)
+test2Dmesh = cartesian_mesh_t((0, 1, 0, 1), (Nx_2D, Ny_2D), (False, False, True, True), \
+                              boundary_conditions = [dirichlet(), dirichlet(), None, None])
+exact  = np.exp(-viscosity * decay_rate(test2Dmesh) * t_end) * field_t(test2Dmesh, f2D).values
+solver = adi_diffusion_solver_t(test2Dmesh, viscosity)
+errors = []
+for num_steps in (10, 20):
+    u  = field_t(test2Dmesh, f2D)
+    dt = t_end / num_steps
+    t1 = time.process_time()
+    for n in range(num_steps):
+        solver.step(u, dt)
+    t2 = time.process_time()
+    errors.append(np.max(np.abs(u.values - exact)))
+print("2D ADI error: ", errors[-1], ", order: ", np.log2(errors[0] / errors[1]), \
+      " (dt / explicit limit = ", dt * viscosity * 4.0 / test2Dmesh.cell_size[0] ** 2, ")")
+print("2D ADI step time: ", (t2 - t1) / num_steps, "s")
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test 3D step
+print("\n\n")
+test3Dmesh = cartesian_mesh_t((0, 1, 0, 1, 0, 1), (Nx_3D, Ny_3D, Nz_3D), \
+                              (False, False, True, True, True, True), \
+                              boundary_conditions = [dirichlet(), dirichlet(), None, None, None, None])
+u = field_t(test3Dmesh, f3D)
+exact = np.exp(-viscosity * decay_rate(test3Dmesh) * 0.1) * u.values
+solver = adi_diffusion_solver_t(test3Dmesh, viscosity)
+t1 = time.process_time()
+solver.step(u, 0.1)
+t2 = time.process_time()
+print("3D ADI error: ", np.max(np.abs(u.values - exact)))
+print("3D ADI step time: ", t2 - t1, "s")
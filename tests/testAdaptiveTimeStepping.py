@@ -0,0 +1,113 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+#
+# --------------------------------------------------------------------------- #
+#!/usr/bin/env python3
+# Modules
+import time
+import sys
+import numpy as np
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from fields.field import field_t
+from operators.differential import laplacian
+from time_integration.adaptive import stable_time_step, bogacki_shampine_t
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Parameters
+verbose = False
+
+# 2D mesh size (adaptive integration)
+Nx_2D = 32
+Ny_2D = 32
+
+#3D mesh size (stable time step)
+Nx_3D = 256
+Ny_3D = 256
+Nz_3D = 256
+
+# Periodic Fourier mode and its decay rate under the discrete Laplacian
+k = 2.0 * np.pi
+def f2D(xx):
+    return np.sin(k * xx[0]) * np.cos(k * xx[1])
+def decay_rate(mesh):
+    return sum([(2.0 - 2.0 * np.cos(k * mesh.cell_size[i])) / mesh.cell_size[i] ** 2 \
+                for i in range(mesh.num_dims)])
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test the stable time step on 3D face velocities
+test3Dmesh = cartesian_mesh_t((0, 1, 0, 1, 0, 1), (Nx_3D, Ny_3D, Nz_3D), (True,) * 6)
+velocities = [field_t(test3Dmesh, lambda xx: (i + 1.0) * np.sin(k * xx[i]), 1, i) \
+              for i in range(test3Dmesh.num_dims)]
+t1 = time.process_time()
+dt = stable_time_step(velocities, cfl=0.5, viscosity=1e-3)
+t2 = time.process_time()
+exact = min(0.5 / sum([(i + 1.0) * Nx_3D for i in range(3)]), 0.25 / (1e-3 * 3 * Nx_3D ** 2))
+print("3D stable time step: ", dt, " (expected ", exact, ")")
+print("3D stable time step time: ", t2 - t1, "s")
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test adaptive integration of the 2D heat equation, with the diffusive limit
+print("\n\n")
+test2Dmesh = cartesian_mesh_t((0, 1, 0, 1), (Nx_2D, Ny_2D), (True,) * 4)
+work2D = np.empty(test2Dmesh.tot_cells)
+def rhs(t, u, dudt):
+    laplacian(u, dudt, work2D)
+def max_dt(t, u):
+    return 0.5 / sum([1.0 / dx ** 2 for dx in test2Dmesh.cell_size])
+t_end = 0.01
+exact = np.exp(-decay_rate(test2Dmesh) * t_end) * field_t(test2Dmesh, f2D).values
+for tol in (1e-4, 1e-6, 1e-8):
+    u = field_t(test2Dmesh, f2D)
+    integrator = bogacki_shampine_t(rhs, u, atol=tol, rtol=tol)
+    integrator.integrate(0.0, t_end, 1e-6, u, max_dt)
+    print("Tolerance ", tol, ": error = ", np.max(np.abs(u.values - exact)), ", steps = ", \
+          integrator.num_accepted, " (", integrator.num_rejected, " rejected), largest step = ", \
+          max(integrator.dt_history), " (limit ", max_dt(0.0, u), ")")
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test rejected steps: a first step far beyond the stability limit (no max_dt)
+# with a tight tolerance must be rejected and shrunk until it is accepted
+print("\n\n")
+u = field_t(test2Dmesh, f2D)
+integrator = bogacki_shampine_t(rhs, u, atol=1e-8, rtol=1e-8)
+dt0 = 100.0 * max_dt(0.0, u)
+result = integrator.adaptive_step(0.0, dt0, u)
+print("Rejected steps: ", integrator.num_rejected, " (expected > 0), accepted step = ", \
+      result[0], " (initial ", dt0, ")")
+print("Rejected steps shrink the step: ", integrator.num_rejected > 0 and result[0] < dt0)
+
+# Test the first stage reuse: changing u between direct steps must not reuse
+# the derivative of the previous state
+u = field_t(test2Dmesh, f2D)
+reference = field_t(test2Dmesh, f2D)
+integrator = bogacki_shampine_t(rhs, u)
+reference_integrator = bogacki_shampine_t(rhs, reference)
+dt = 0.1 * max_dt(0.0, u)
+integrator.step(0.0, dt, u)
+u.values *= 0.5
+reference.values[...] = u.values
+integrator.step(dt, dt, u)
+reference_integrator.step(dt, dt, reference)
+print("Modified state error: ", np.max(np.abs(u.values - reference.values)))
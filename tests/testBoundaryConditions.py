@@ -0,0 +1,117 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+#
+# --------------------------------------------------------------------------- #
+#!/usr/bin/env python3
+# Modules
+import time
+import sys
+import numpy as np
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from mesh.boundary_conditions import dirichlet, neumann, robin
+from fields.field import field_t
+from operators.differential import laplacian
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Parameters
+verbose = False
+
+# 2D mesh size
+Nx_2D = 4096
+Ny_2D = 4096
+
+# Test function (periodic along y) and its Laplacian
+k = 2.0 * np.pi
+def f2D(xx):
+    return np.exp(xx[0]) * np.cos(k * xx[1])
+def lapf2D(xx):
+    return (1.0 - k ** 2) * f2D(xx)
+
+# Values of f2D on the x = 0 and x = 1 faces (equal to its x derivative)
+def face_values(x):
+    return np.exp(x) * np.cos(k * (np.arange(Ny_2D) + 0.5) / Ny_2D)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test 2D Laplacian with Dirichlet, Neumann and Robin conditions along x
+bc_sets = {"Dirichlet": (dirichlet(face_values(0.0)), dirichlet(face_values(1.0))), \
+           "Neumann":   (neumann(-face_values(0.0)),  neumann(face_values(1.0))), \
+           "Robin":     (robin(1.0, 1.0, 0.0),        robin(1.0, 1.0, 2.0 * face_values(1.0)))}
+for name in bc_sets:
+    (lower, upper) = bc_sets[name]
+    test2Dmesh = cartesian_mesh_t((0, 1, 0, 1), (Nx_2D, Ny_2D), (False, False, True, True), \
+                                  boundary_conditions = [lower, upper, None, None])
+    field2D = field_t(test2Dmesh, f2D)
+    exact   = field_t(test2Dmesh, lapf2D)
+    work2D  = np.empty(test2Dmesh.tot_cells)
+    lap2D   = laplacian(field2D, work=work2D)
+    t1 = time.process_time()
+    laplacian(field2D, lap2D, work2D)
+    t2 = time.process_time()
+    # Boundary cells are only first order accurate: compare the interior ones
+    error = np.max(np.abs(lap2D.view[1:-1, :] - exact.view[1:-1, :]))
+    print("2D Laplacian error (" + name + "): ", error, " (h^2 = ", test2Dmesh.cell_size[0] ** 2, ")")
+    print("2D Laplacian time  (" + name + "): ", t2 - t1, "s")
+    # Same result using ghost layers
+    halo2D = field_t(test2Dmesh, f2D, halo_width=2)
+    t1 = time.process_time()
+    halo2D.fill_halo()
+    t2 = time.process_time()
+    print("2D halo mismatch    (" + name + "): ", \
+          np.max(np.abs(laplacian(halo2D, work=work2D).values - lap2D.values)))
+    print("2D halo fill time   (" + name + "): ", t2 - t1, "s\n")
+
+# Dirichlet boundary nodes of x-face fields are set when applying the conditions
+test2Dmesh.set_boundary_conditions([dirichlet(-1.0), dirichlet(2.0), None, None])
+face2D = field_t(test2Dmesh, 1.0, 1, 0)
+face2D.apply_boundary_conditions()
+print("2D Dirichlet face values: ", face2D.view[0, 0], face2D.view[-1, 0], face2D.view[1, 0])
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test the ghost values written into the padded array by fill_halo: Dirichlet
+# (lower x) and Neumann (upper x) mirrors, periodic wrap along y
+print("\n\n")
+halo_width = 2
+ghostMesh = cartesian_mesh_t((0, 1, 0, 1), (16, 12), (False, False, True, True), \
+                             boundary_conditions = [dirichlet(0.5), neumann(2.0), None, None])
+ghost2D = field_t(ghostMesh, f2D, halo_width=halo_width)
+ghost2D.fill_halo()
+u  = ghost2D.view
+dx = ghostMesh.cell_size[0]
+print("Padded shape: ", ghost2D.padded.shape, ", values share the padded array: ", \
+      np.shares_memory(ghost2D.values, ghost2D.padded))
+# Layer k (1 touching the boundary) mirrors the k-th point from the boundary,
+# at distance (2k - 1) dx
+dirichlet_error = 0.0
+neumann_error   = 0.0
+for k in range(1, halo_width + 1):
+    lower = ghost2D.padded[halo_width - k, halo_width:-halo_width]
+    upper = ghost2D.padded[-halo_width - 1 + k, halo_width:-halo_width]
+    dirichlet_error = max(dirichlet_error, np.max(np.abs(lower - (2.0 * 0.5 - u[k - 1, :]))))
+    neumann_error   = max(neumann_error, np.max(np.abs(upper - (u[-k, :] + 2.0 * (2 * k - 1) * dx))))
+periodic_error = max(np.max(np.abs(ghost2D.padded[halo_width:-halo_width, :halo_width] - u[:, -halo_width:])), \
+                     np.max(np.abs(ghost2D.padded[halo_width:-halo_width, -halo_width:] - u[:, :halo_width])))
+print("Dirichlet ghost error: ", dirichlet_error)
+print("Neumann ghost error:   ", neumann_error)
+print("Periodic ghost error:  ", periodic_error)
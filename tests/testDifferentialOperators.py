@@ -0,0 +1,141 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+#!/usr/bin/env python3
+# Modules
+import time
+import sys
+import numpy as np
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from fields.field import field_t
+from operators.differential import gradient, divergence, laplacian
+from operators.differential import curl_edges_to_faces, curl_faces_to_edges
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Parameters
+verbose = False
+
+# 2D mesh size
+Nx_2D = 4096
+Ny_2D = 4096
+
+#3D mesh size
+Nx_3D = 256
+Ny_3D = 256
+Nz_3D = 256
+
+# Periodic test functions and their derivatives
+k = 2.0 * np.pi
+def f2D(xx):
+    return np.sin(k * xx[0]) * np.cos(k * xx[1])
+def df2D(xx):
+    return (k * np.cos(k * xx[0]) * np.cos(k * xx[1]), \
+            - k * np.sin(k * xx[0]) * np.sin(k * xx[1]))
+def f3D(xx):
+    return np.sin(k * xx[0]) * np.cos(k * xx[1]) * np.sin(k * xx[2])
+def df3D(xx):
+    return (k * np.cos(k * xx[0]) * np.cos(k * xx[1]) * np.sin(k * xx[2]), \
+            - k * np.sin(k * xx[0]) * np.sin(k * xx[1]) * np.sin(k * xx[2]), \
+            k * np.sin(k * xx[0]) * np.cos(k * xx[1]) * np.cos(k * xx[2]))
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test 2D gradient
+test2Dmesh = cartesian_mesh_t((0, 1, 0, 1), (Nx_2D, Ny_2D), (True, True, True, True))
+field2D = field_t(test2Dmesh, f2D)
+grad2D  = gradient(field2D)
+t1 = time.process_time()
+gradient(field2D, grad2D)
+t2 = time.process_time()
+error = 0.0
+for i in range(test2Dmesh.num_face_orientations):
+    exact = field_t(test2Dmesh, lambda xx: df2D(xx)[i], 1, i)
+    error = max(error, np.max(np.abs(grad2D[i].values - exact.values)))
+print("2D gradient error: ", error, " (h^2 = ", test2Dmesh.cell_size[0] ** 2, ")")
+print("2D gradient time:  ", t2 - t1, "s")
+
+# Test 2D divergence and Laplacian (preallocated outputs)
+work2D = np.empty(test2Dmesh.tot_cells)
+div2D  = divergence(grad2D, work=work2D)
+lap2D  = laplacian(field2D, work=work2D)
+t1 = time.process_time()
+divergence(grad2D, div2D, work2D)
+t2 = time.process_time()
+laplacian(field2D, lap2D, work2D)
+t3 = time.process_time()
+error = np.max(np.abs(lap2D.values + 2.0 * k ** 2 * field2D.values))
+print("2D Laplacian error: ", error, " (div(grad) mismatch = ", \
+      np.max(np.abs(lap2D.values - div2D.values)), ")")
+print("2D divergence time: ", t2 - t1, "s")
+print("2D Laplacian time:  ", t3 - t2, "s")
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test 3D gradient
+print("\n\n")
+test3Dmesh = cartesian_mesh_t((0, 1, 0, 1, 0, 1), (Nx_3D, Ny_3D, Nz_3D), (True,) * 6)
+field3D = field_t(test3Dmesh, f3D)
+grad3D  = gradient(field3D)
+t1 = time.process_time()
+gradient(field3D, grad3D)
+t2 = time.process_time()
+error = 0.0
+for i in range(test3Dmesh.num_face_orientations):
+    exact = field_t(test3Dmesh, lambda xx: df3D(xx)[i], 1, i)
+    error = max(error, np.max(np.abs(grad3D[i].values - exact.values)))
+print("3D gradient error: ", error, " (h^2 = ", test3Dmesh.cell_size[0] ** 2, ")")
+print("3D gradient time:  ", t2 - t1, "s")
+
+# Test 3D divergence and Laplacian (preallocated outputs)
+work3D = np.empty(test3Dmesh.tot_cells)
+div3D  = divergence(grad3D, work=work3D)
+lap3D  = laplacian(field3D, work=work3D)
+t1 = time.process_time()
+divergence(grad3D, div3D, work3D)
+t2 = time.process_time()
+laplacian(field3D, lap3D, work3D)
+t3 = time.process_time()
+error = np.max(np.abs(lap3D.values + 3.0 * k ** 2 * field3D.values))
+print("3D Laplacian error: ", error, " (div(grad) mismatch = ", \
+      np.max(np.abs(lap3D.values - div3D.values)), ")")
+print("3D divergence time: ", t2 - t1, "s")
+print("3D Laplacian time:  ", t3 - t2, "s")
+
+# Test 3D curl (div(curl) and curl(grad) vanish identically)
+del div3D, lap3D, work3D
+edges3D = curl_faces_to_edges(grad3D)
+t1 = time.process_time()
+curl_faces_to_edges(grad3D, edges3D)
+t2 = time.process_time()
+error = max([np.max(np.abs(edge.values)) for edge in edges3D])
+print("3D curl(grad) error: ", error)
+print("3D curl (faces to edges) time: ", t2 - t1, "s")
+for i in range(test3Dmesh.num_edge_orientations):
+    edges3D[i] = field_t(test3Dmesh, f3D, 2, i)
+curl_edges_to_faces(edges3D, grad3D)
+t1 = time.process_time()
+curl_edges_to_faces(edges3D, grad3D)
+t2 = time.process_time()
+error = np.max(np.abs(divergence(grad3D).values))
+print("3D div(curl) error: ", error)
+print("3D curl (edges to faces) time: ", t2 - t1, "s")
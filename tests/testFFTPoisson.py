@@ -0,0 +1,79 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+#
+# --------------------------------------------------------------------------- #
+#!/usr/bin/env python3
+# Modules
+import time
+import sys
+import numpy as np
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from fields.field import field_t
+from operators.differential import laplacian
+from solvers.fft_poisson import fft_poisson_solver_t
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Parameters
+verbose = False
+
+# 2D mesh size
+Nx_2D = 4096
+Ny_2D = 4096
+
+#3D mesh size
+Nx_3D = 256
+Ny_3D = 256
+Nz_3D = 256
+
+# Zero mean periodic test functions
+k = 2.0 * np.pi
+def f2D(xx):
+    return np.sin(k * xx[0]) * np.cos(2.0 * k * xx[1]) + np.cos(3.0 * k * xx[0])
+def f3D(xx):
+    return np.sin(k * xx[0]) * np.cos(k * xx[1]) * np.sin(2.0 * k * xx[2]) + np.cos(k * xx[1])
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Solves the Poisson problem with the discrete Laplacian of a known field
+def check_solver(mesh, f, name):
+    exact = field_t(mesh, f)
+    rhs   = laplacian(exact)
+    t1 = time.process_time()
+    solver = fft_poisson_solver_t(mesh)
+    t2 = time.process_time()
+    solution = solver.solve(rhs)
+    t3 = time.process_time()
+    solver.solve(rhs, solution)
+    t4 = time.process_time()
+    print(name + " Poisson error:      ", np.max(np.abs(solution.values - exact.values)))
+    print(name + " Poisson setup time: ", t2 - t1, "s")
+    print(name + " Poisson solve time: ", t4 - t3, "s (first call: ", t3 - t2, "s)")
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test 2D solver
+check_solver(cartesian_mesh_t((0, 1, 0, 1), (Nx_2D, Ny_2D), (True,) * 4), f2D, "2D")
+
+# Test 3D solver
+print("\n\n")
+check_solver(cartesian_mesh_t((0, 1, 0, 1, 0, 1), (Nx_3D, Ny_3D, Nz_3D), (True,) * 6), f3D, "3D")
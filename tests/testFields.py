@@ -31,6 +31,7 @@ sys.path.append('../')
 from mesh.cartesian_mesh import cartesian_mesh_t
 from tools.combination_index import combination_index # check if actually needed
 from fields.field import field_t
+from operators.differential import laplacian
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
 # Parameters
@@ -54,4 +55,71 @@ field2D_2 = field_t(test2Dmesh, 9)
 def f0(xx):
     return xx[0] ** 2
 field2D_3 = field_t(test2Dmesh, f0, 1, 1)
-field2D_4 = field2D_1.create_copy()
\ No newline at end of file
+field2D_4 = field2D_1.create_copy()
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test eager vs. deferred evaluation of field expressions
+from fields import field_expression
+field2D_5 = field_t(test2Dmesh, lambda xx: xx[0] * xx[1])
+t1 = time.process_time()
+field2D_6 = field2D_2 * field2D_5 + field2D_2 * field2D_2 - field2D_5
+t2 = time.process_time()
+if (verbose): print("Eager evaluation time: ", t2 - t1, "s")
+field2D_7 = field_t(test2Dmesh)
+t1 = time.process_time()
+with field_expression.deferred():
+    field2D_7[...] = field2D_2 * field2D_5 + field2D_2 * field2D_2 - field2D_5
+t2 = time.process_time()
+if (verbose): print("Deferred evaluation time: ", t2 - t1, "s")
+print("Deferred evaluation error: ", np.max(np.abs(field2D_7.values - field2D_6.values)))
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test in-place operators: the result is the same field, writing into the same
+# buffer, with field, scalar and array operands
+field2D_8 = field_t(test2Dmesh, f0)
+field2D_9 = field_t(test2Dmesh, lambda xx: xx[0] * xx[1])
+expected = field2D_8.values.copy()
+buffer = field2D_8.values
+dt = 0.25
+def check_inplace(name, result, expected):
+    same = isinstance(result, field_t) and result is field2D_8 and \
+           result.values is buffer and np.shares_memory(result.values, buffer)
+    print("In-place " + name + " same buffer: ", same, \
+          ", error: ", np.max(np.abs(result.values - expected)))
+field2D_8 += dt * field2D_9
+expected += dt * field2D_9.values
+check_inplace("+= field", field2D_8, expected)
+field2D_8 *= 2
+expected *= 2
+check_inplace("*= scalar", field2D_8, expected)
+divisor = 1.0 + field2D_9.values
+field2D_8 /= divisor
+expected /= divisor
+check_inplace("/= array", field2D_8, expected)
+field2D_8 **= 2
+expected **= 2
+check_inplace("**= scalar", field2D_8, expected)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test NumPy ufuncs and functions on fields
+field2D_10 = np.sin(field2D_9)
+print("np.sin returns a field: ", isinstance(field2D_10, field_t), \
+      ", error: ", np.max(np.abs(field2D_10.values - np.sin(field2D_9.values))))
+field2D_11 = field_t(test2Dmesh)
+result = np.add(field2D_9, field2D_5, out=field2D_11)
+print("np.add with out returns out: ", result is field2D_11, \
+      ", error: ", np.max(np.abs(field2D_11.values - (field2D_9.values + field2D_5.values))))
+print("np.sum error: ", abs(np.sum(field2D_9) - np.sum(field2D_9.values)))
+print("np.max error: ", abs(np.max(field2D_9) - np.max(field2D_9.values)))
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test single precision: float32 fields stay float32 through the operators, the
+# ufuncs and the Laplacian
+test2Dmesh_32 = cartesian_mesh_t((0, 1, 0, 1), (Nx_2D, Ny_2D), (True,) * 4, dtype=np.float32)
+field2D_12 = field_t(test2Dmesh_32, f0)
+field2D_13 = field_t(test2Dmesh_32, lambda xx: xx[0] * xx[1])
+results = [field2D_12, field2D_12 + field2D_13, 2.0 * field2D_12 - field2D_13 / 3.0, \
+           field2D_12 * field2D_13, field2D_12 ** 2, -field2D_12, np.sin(field2D_12), \
+           np.exp(field2D_13), laplacian(field2D_12)]
+print("Single precision dtypes: ", set([str(f.dtype) for f in results]), \
+      ", all fields: ", all([isinstance(f, field_t) for f in results]))
@@ -0,0 +1,71 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+#!/usr/bin/env python3
+# Modules
+import time
+import sys
+import numpy as np
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from fields.field import field_t
+from operators.interpolation import interpolate
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Parameters
+verbose = False
+
+#3D mesh size
+Nx_3D = 256
+Ny_3D = 256
+Nz_3D = 256
+
+# Periodic test function
+k = 2.0 * np.pi
+def f3D(xx):
+    return np.sin(k * xx[0]) * np.cos(k * xx[1]) * np.sin(k * xx[2])
+
+# Pairs of locations (num_directions, orientation)
+pairs = [((0, 0), (1, 0)), ((1, 2), (0, 0)), ((1, 0), (2, 1)), ((2, 2), (1, 1)), \
+         ((2, 0), (3, 0)), ((3, 0), (2, 2))]
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test 3D interpolation (second and fourth order)
+test3Dmesh = cartesian_mesh_t((0, 1, 0, 1, 0, 1), (Nx_3D, Ny_3D, Nz_3D), (True,) * 6)
+work3D = np.empty(max(test3Dmesh.tot_corners))
+for order in (2, 4):
+    error    = 0.0
+    tot_time = 0.0
+    for (src, dst) in pairs:
+        field3D = field_t(test3Dmesh, f3D, src[0], src[1])
+        exact   = field_t(test3Dmesh, f3D, dst[0], dst[1])
+        result  = field_t(test3Dmesh, 0.0, dst[0], dst[1])
+        t1 = time.process_time()
+        interpolate(field3D, dst[0], dst[1], result, order, work3D)
+        t2 = time.process_time()
+        if (verbose): print("\t", src, " -> ", dst, ": ", t2 - t1, "s")
+        error = max(error, np.max(np.abs(result.values - exact.values)))
+        tot_time += t2 - t1
+    print("Order ", order, " interpolation error: ", error)
+    print("Order ", order, " interpolation time per call: ", tot_time / len(pairs), "s")
@@ -0,0 +1,81 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+#
+# --------------------------------------------------------------------------- #
+#!/usr/bin/env python3
+# Modules
+import time
+import sys
+import numpy as np
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from mesh.boundary_conditions import dirichlet
+from fields.field import field_t
+from operators.differential import laplacian
+from operators.linear_operators import laplacian_operator
+from solvers.krylov import krylov_solver_t
+from solvers.multigrid import multigrid_solver_t
+from solvers.preconditioners import jacobi_preconditioner_t, ssor_preconditioner_t, \
+                                    ilu_preconditioner_t, multigrid_preconditioner_t
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Parameters
+verbose = False
+
+# 2D mesh size
+Nx_2D = 256
+Ny_2D = 256
+
+# Test function
+k = 2.0 * np.pi
+def f2D(xx):
+    return np.exp(xx[0]) * np.cos(k * xx[1])
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test 2D solvers (Dirichlet along x, periodic along y): the constant part of
+# the Laplacian (inhomogeneous conditions) is moved to the right hand side
+test2Dmesh = cartesian_mesh_t((0, 1, 0, 1), (Nx_2D, Ny_2D), (False, False, True, True), \
+                              boundary_conditions = [dirichlet(1.0), dirichlet(np.e), None, None])
+exact = field_t(test2Dmesh, f2D)
+rhs   = laplacian(exact) - laplacian(field_t(test2Dmesh, 0.0))
+operator = laplacian_operator(test2Dmesh)
+matrix   = test2Dmesh.sparse_operator("laplacian")
+multigrid = multigrid_solver_t(test2Dmesh, test2Dmesh.boundary_conditions.homogeneous())
+preconditioners = {"none": None, \
+                   "Jacobi": jacobi_preconditioner_t(operator), \
+                   "SSOR": ssor_preconditioner_t(matrix), \
+                   "ILU": ilu_preconditioner_t(matrix), \
+                   "multigrid": multigrid_preconditioner_t(multigrid)}
+for method in ("cg", "bicgstab", "gmres"):
+    for name in preconditioners:
+        # The incomplete factors are not symmetric
+        if method == "cg" and name == "ILU":
+            continue
+        solver = krylov_solver_t(operator, method, preconditioners[name])
+        t1 = time.process_time()
+        solution = solver.solve(rhs, tol=1e-10, max_iterations=2000)
+        t2 = time.process_time()
+        print(method + " (" + name + "): ", solver.num_iterations, " iterations, error = ", \
+              np.max(np.abs(solution.values - exact.values)), ", time = ", t2 - t1, "s")
+    print("")
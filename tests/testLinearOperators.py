@@ -0,0 +1,91 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+#
+# --------------------------------------------------------------------------- #
+#!/usr/bin/env python3
+# Modules
+import time
+import sys
+import numpy as np
+import scipy.sparse.linalg as sparse_linalg
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from mesh.boundary_conditions import dirichlet
+from fields.field import field_t
+from operators.linear_operators import laplacian_operator, gradient_operator, divergence_operator
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Parameters
+verbose = False
+
+#3D mesh size
+Nx_3D = 256
+Ny_3D = 256
+Nz_3D = 256
+
+# Test function
+k = 2.0 * np.pi
+def f(xx):
+    return np.sin(k * xx[0]) * np.cos(k * xx[1]) * np.sin(k * xx[2])
+def g(xx):
+    return xx[0] * (1.0 - xx[0]) * np.cos(k * xx[1])
+def lapg(xx):
+    return - (2.0 + k ** 2 * xx[0] * (1.0 - xx[0])) * np.cos(k * xx[1])
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test against the assembled matrices on a small 3D mesh (Dirichlet along x)
+test3Dmesh = cartesian_mesh_t((0, 1, 0, 1, 0, 1), (32, 32, 32), (False, False, True, True, True, True), \
+                              boundary_conditions = [dirichlet(), dirichlet(), None, None, None, None])
+field3D = field_t(test3Dmesh, f)
+L = laplacian_operator(test3Dmesh)
+G = gradient_operator(test3Dmesh)
+D = divergence_operator(test3Dmesh)
+error = np.max(np.abs(L @ field3D - test3Dmesh.sparse_operator("laplacian") @ field3D.values))
+error = max(error, np.max(np.abs(L.diagonal() - test3Dmesh.sparse_operator("laplacian").diagonal())))
+grad = G @ field3D
+error = max(error, np.max(np.abs(grad - test3Dmesh.sparse_operator("gradient") @ field3D.values)))
+error = max(error, np.max(np.abs(D @ grad - test3Dmesh.sparse_operator("divergence") @ grad)))
+print("3D matrix-free vs. sparse error: ", error)
+
+# Solve a Poisson problem with scipy CG
+exact = field_t(test3Dmesh, g)
+rhs   = field_t(test3Dmesh, lapg)
+t1 = time.process_time()
+(solution, info) = sparse_linalg.cg(L.to_scipy(), rhs.values, rtol=1e-10, maxiter=1000)
+t2 = time.process_time()
+print("3D Poisson (CG) error: ", np.max(np.abs(solution - exact.values)), " (info = ", info, ")")
+print("3D Poisson (CG) time:  ", t2 - t1, "s")
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Time the matrix-free Laplacian on a large 3D mesh (no matrix is stored)
+print("\n\n")
+test3Dmesh = cartesian_mesh_t((0, 1, 0, 1, 0, 1), (Nx_3D, Ny_3D, Nz_3D), (True,) * 6)
+field3D = field_t(test3Dmesh, f)
+L = laplacian_operator(test3Dmesh)
+out = np.empty(test3Dmesh.tot_cells)
+t1 = time.process_time()
+L.matvec(field3D.values, out)
+t2 = time.process_time()
+print("3D Laplacian error: ", np.max(np.abs(out + 3.0 * k ** 2 * field3D.values)))
+print("3D matrix-free Laplacian time: ", t2 - t1, "s")
@@ -0,0 +1,108 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+#!/usr/bin/env python3
+# Modules
+import math
+import sys
+import numpy as np
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from tools.combination_index import combination_index
+from fields.field import field_t
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Parameters
+verbose = False
+
+# 2D mesh size
+Nx_2D = 64
+Ny_2D = 48
+
+#3D mesh size
+Nx_3D = 16
+Ny_3D = 12
+Nz_3D = 8
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test lazy coordinates: nothing is computed until the coordinates are used,
+# and clear_coords releases them
+test2Dmesh = cartesian_mesh_t((0, 1, 0, 2), (Nx_2D, Ny_2D))
+print("Coordinates cached after construction: ", len(test2Dmesh.coord_cache))
+centres = test2Dmesh.cell_centre_array
+faces = test2Dmesh.cell_face_arrays[1]
+print("Coordinates cached after use: ", sorted(test2Dmesh.coord_cache))
+print("Cached coordinates reused: ", test2Dmesh.coords() is test2Dmesh.cell_centre_array)
+test2Dmesh.clear_coords(1)
+print("Coordinates cached after clearing faces: ", sorted(test2Dmesh.coord_cache))
+test2Dmesh.clear_coords()
+print("Coordinates cached after clearing all: ", len(test2Dmesh.coord_cache))
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test separable coordinates against full arrays computed point by point (as
+# x0 + cell_size * local index) at every location of 2D and 3D meshes
+def full_coords(mesh, num_directions, orientation):
+    indexes = mesh.local_index(np.arange(mesh.tot_points[num_directions][orientation]), \
+                               num_directions, orientation)
+    comb_idx = combination_index(mesh.num_dims, num_directions, orientation)
+    if comb_idx==None: comb_idx=()
+    coords = [None] * mesh.num_dims
+    for i in range(mesh.num_dims):
+        x0 = mesh.domain[i][0] + (0.0 if i in comb_idx else 0.5 * mesh.cell_size[i])
+        coords[i] = x0 + mesh.cell_size[i] * indexes[i]
+    return coords
+
+test3Dmesh = cartesian_mesh_t((0, 1, -1, 1, 0, 3), (Nx_3D, Ny_3D, Nz_3D))
+for mesh in (test2Dmesh, test3Dmesh):
+    coords_error = 0.0
+    grid_error   = 0.0
+    zero_strides = True
+    for n in range(mesh.num_dims + 1):
+        for o in range(math.comb(mesh.num_dims, n)):
+            full = full_coords(mesh, n, o)
+            grid = mesh.grid_coords(n, o)
+            flat = mesh.coords(n, o)
+            for i in range(mesh.num_dims):
+                shape = tuple(mesh.num_points[n][o])
+                coords_error = max(coords_error, np.max(np.abs(flat[i] - full[i])))
+                grid_error = max(grid_error, np.max(np.abs(grid[i] - \
+                                 full[i].reshape(shape, order=mesh.array_order()))))
+                zero_strides = zero_strides and grid[i].strides.count(0) == mesh.num_dims - 1
+    print(str(mesh.num_dims) + "D flat coordinates error: ", coords_error)
+    print(str(mesh.num_dims) + "D grid coordinates error: ", grid_error, \
+          ", zero strides off their axis: ", zero_strides)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test structured views of field values: they share memory with the values
+# (with and without ghost layers) and writing through them changes the field
+for halo_width in (0, 2):
+    field = field_t(test2Dmesh, lambda xx: xx[0] + xx[1], 1, 0, halo_width=halo_width)
+    views = [field[...], field[:, 1], field[1:-1, ::2], field.view]
+    shared = all([np.shares_memory(v, field.values) for v in views])
+    field[:, 1][...] = -1.0
+    print("Halo width ", halo_width, " views share memory: ", shared, \
+          ", write through view: ", field[3, 1] == -1.0, \
+          ", structured element error: ", abs(field[3, 0] - (3.0 * test2Dmesh.cell_size[0] + \
+                                              0.5 * test2Dmesh.cell_size[1])))
@@ -263,4 +263,28 @@ print("\n\nThe cumulative error is: ", c_error)
 
 print("Total time elapsed for 3D grid: ", tot_time, "s")
 print("Total number of function calls: ", tot_comp)
-print("Time elapsed per function call: ", tot_time / tot_comp, "s")
\ No newline at end of file
+print("Time elapsed per function call: ", tot_time / tot_comp, "s")
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test 3D boundary and neighbour index sets (cells), against local_index
+print("\n\n")
+error = 0
+i = np.arange(test3Dmesh.tot_cells)
+index_tuple = test3Dmesh.local_index(i)
+t1 = time.process_time()
+for axis in range(test3Dmesh.num_dims):
+    for side in range(2):
+        boundary   = test3Dmesh.boundary_indices(axis, side)
+        neighbours = test3Dmesh.neighbour_indices(axis, side)
+t2 = time.process_time()
+for axis in range(test3Dmesh.num_dims):
+    for side in range(2):
+        layer = 0 if side == 0 else test3Dmesh.num_cells[axis] - 1
+        error += np.sum(test3Dmesh.boundary_indices(axis, side) != i[index_tuple[axis] == layer])
+        neighbours = test3Dmesh.neighbour_indices(axis, side)
+        inside = index_tuple[axis] != layer
+        check_i = list(index_tuple)
+        check_i[axis] = index_tuple[axis] + (-1 if side == 0 else 1)
+        error += np.sum(neighbours[inside] != test3Dmesh.global_index(check_i)[inside])
+        error += np.sum(neighbours[~inside] != -1)
+print("Boundary and neighbour index error: ", error)
+print("Boundary and neighbour index time:  ", t2 - t1, "s")
@@ -0,0 +1,89 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+#
+# --------------------------------------------------------------------------- #
+#!/usr/bin/env python3
+# Modules
+import time
+import sys
+import numpy as np
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from mesh.boundary_conditions import dirichlet, robin
+from fields.field import field_t
+from operators.differential import laplacian
+from solvers.multigrid import multigrid_solver_t
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Parameters
+verbose = False
+
+# 2D mesh size
+Nx_2D = 4096
+Ny_2D = 4096
+
+#3D mesh size
+Nx_3D = 256
+Ny_3D = 256
+Nz_3D = 256
+
+# Test functions
+k = 2.0 * np.pi
+def f2D(xx):
+    return np.exp(xx[0]) * np.cos(k * xx[1])
+def f3D(xx):
+    return np.exp(xx[0]) * np.cos(k * xx[1]) * np.sin(k * xx[2])
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Solves the Poisson problem with the discrete Laplacian of a known field
+def check_solver(mesh, f, name, cycle, smoother):
+    exact  = field_t(mesh, f)
+    rhs    = laplacian(exact)
+    solver = multigrid_solver_t(mesh, cycle=cycle, smoother=smoother)
+    t1 = time.process_time()
+    solution = solver.solve(rhs, tol=1e-8)
+    t2 = time.process_time()
+    history = solver.residual_history
+    rate = (history[-1] / history[0]) ** (1.0 / (len(history) - 1))
+    print(name + " " + cycle + "-cycle (" + smoother + ") error:       ", \
+          np.max(np.abs(solution.values - exact.values)))
+    print(name + " " + cycle + "-cycle (" + smoother + ") convergence: ", rate, \
+          " (", len(history) - 1, " cycles,", len(solver.levels), " levels)")
+    print(name + " " + cycle + "-cycle (" + smoother + ") time:        ", t2 - t1, "s")
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test 2D solver (Dirichlet along x, periodic along y)
+for N in (Nx_2D // 4, Nx_2D):
+    test2Dmesh = cartesian_mesh_t((0, 1, 0, 1), (N, N * Ny_2D // Nx_2D), (False, False, True, True), \
+                                  boundary_conditions = [dirichlet(1.0), dirichlet(np.e), None, None])
+    check_solver(test2Dmesh, f2D, "2D (" + str(N) + ")", "V", "rbgs")
+check_solver(test2Dmesh, f2D, "2D (" + str(N) + ")", "F", "jacobi")
+
+# Test 3D solver (Robin along x, zero gradient along y, periodic along z)
+print("\n\n")
+test3Dmesh = cartesian_mesh_t((0, 1, 0, 1, 0, 1), (Nx_3D, Ny_3D, Nz_3D), \
+                              (False, False, False, False, True, True), \
+                              boundary_conditions = [robin(1.0, 1.0), robin(1.0, 1.0), \
+                                                     None, None, None, None])
+check_solver(test3Dmesh, f3D, "3D", "W", "rbgs")
@@ -0,0 +1,91 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+#
+# --------------------------------------------------------------------------- #
+#!/usr/bin/env python3
+# Modules
+import time
+import sys
+import numpy as np
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from mesh.boundary_conditions import dirichlet, robin
+from fields.field import field_t
+from operators.differential import gradient, divergence, laplacian
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Parameters
+verbose = False
+
+# 2D mesh size
+Nx_2D = 2048
+Ny_2D = 2048
+
+#3D mesh size
+Nx_3D = 128
+Ny_3D = 128
+Nz_3D = 128
+
+# Test function
+k = 2.0 * np.pi
+def f(xx):
+    return np.exp(xx[0]) * np.cos(k * xx[1])
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Compares the sparse operators with the matrix-free ones
+def check_operators(mesh, name):
+    field = field_t(mesh, f)
+    zero  = field_t(mesh, 0.0)
+    t1 = time.process_time()
+    A = mesh.sparse_operator("laplacian")
+    t2 = time.process_time()
+    mesh.sparse_operator("laplacian")
+    t3 = time.process_time()
+    # Affine part of the operator (inhomogeneous boundary conditions)
+    error = np.max(np.abs(A @ field.values + laplacian(zero).values - laplacian(field).values))
+    print(name + " Laplacian matrix error:  ", error)
+    print(name + " Laplacian assembly time: ", t2 - t1, "s (cached: ", t3 - t2, "s)")
+    G = mesh.sparse_operator("gradient")
+    faces = gradient(field)
+    zero_faces = gradient(zero)
+    exact = np.concatenate([faces[i].values - zero_faces[i].values for i in range(len(faces))])
+    print(name + " gradient matrix error:   ", np.max(np.abs(G @ field.values - exact)))
+    D = mesh.sparse_operator("divergence")
+    exact = divergence(faces).values
+    print(name + " divergence matrix error: ", \
+          np.max(np.abs(D @ np.concatenate([face.values for face in faces]) - exact)))
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test 2D operators (Dirichlet along x, periodic along y)
+test2Dmesh = cartesian_mesh_t((0, 1, 0, 1), (Nx_2D, Ny_2D), (False, False, True, True), \
+                              boundary_conditions = [dirichlet(1.0), dirichlet(2.0), None, None])
+check_operators(test2Dmesh, "2D")
+
+# Test 3D operators (Robin along x, zero gradient along y, periodic along z)
+print("\n\n")
+test3Dmesh = cartesian_mesh_t((0, 1, 0, 1, 0, 1), (Nx_3D, Ny_3D, Nz_3D), \
+                              (False, False, False, False, True, True), \
+                              boundary_conditions = [robin(1.0, 0.5, 1.0), robin(2.0, 1.0), \
+                                                     None, None, None, None])
+check_operators(test3Dmesh, "3D")
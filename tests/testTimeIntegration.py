@@ -0,0 +1,96 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+#
+# --------------------------------------------------------------------------- #
+#!/usr/bin/env python3
+# Modules
+import time
+import sys
+import numpy as np
+sys.path.append('../')
+from mesh.cartesian_mesh import cartesian_mesh_t
+from fields.field import field_t
+from operators.differential import laplacian
+from time_integration.runge_kutta import forward_euler_t, ssp_rk3_t, low_storage_rk4_t
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Parameters
+verbose = False
+
+# 2D mesh size (convergence test)
+Nx_2D = 32
+Ny_2D = 32
+
+#3D mesh size (timing test)
+Nx_3D = 256
+Ny_3D = 256
+Nz_3D = 256
+
+# Periodic Fourier mode and its decay rate under the discrete Laplacian
+k = 2.0 * np.pi
+def f2D(xx):
+    return np.sin(k * xx[0]) * np.cos(k * xx[1])
+def decay_rate(mesh):
+    return sum([(2.0 - 2.0 * np.cos(k * mesh.cell_size[i])) / mesh.cell_size[i] ** 2 \
+                for i in range(mesh.num_dims)])
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Test the order of convergence on the 2D heat equation (two decoupled fields)
+test2Dmesh = cartesian_mesh_t((0, 1, 0, 1), (Nx_2D, Ny_2D), (True,) * 4)
+work2D = np.empty(test2Dmesh.tot_cells)
+def rhs(t, u, dudt):
+    for i in range(len(u)):
+        laplacian(u[i], dudt[i], work2D)
+def rhs_add(t, u, dudt):
+    for i in range(len(u)):
+        dudt[i] += laplacian(u[i], work=work2D)
+t_end = 0.01
+exact = np.exp(-decay_rate(test2Dmesh) * t_end) * field_t(test2Dmesh, f2D).values
+integrators = {"forward Euler": lambda u: forward_euler_t(rhs, u), \
+               "SSP-RK3": lambda u: ssp_rk3_t(rhs, u), \
+               "low-storage RK4": lambda u: low_storage_rk4_t(rhs, u), \
+               "low-storage RK4 (accumulate)": lambda u: low_storage_rk4_t(rhs_add, u, True)}
+for name in integrators:
+    errors = []
+    for num_steps in (80, 160):
+        u = [field_t(test2Dmesh, f2D), field_t(test2Dmesh, f2D)]
+        integrator = integrators[name](u)
+        integrator.integrate(0.0, t_end, t_end / num_steps, u)
+        errors.append(max([np.max(np.abs(field.values - exact)) for field in u]))
+    print(name + " error: ", errors[-1], ", order: ", np.log2(errors[0] / errors[1]), \
+          ", registers: ", len(integrator.registers))
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Time one 3D step
+print("\n\n")
+test3Dmesh = cartesian_mesh_t((0, 1, 0, 1, 0, 1), (Nx_3D, Ny_3D, Nz_3D), (True,) * 6)
+work3D = np.empty(test3Dmesh.tot_cells)
+def rhs3D(t, u, dudt):
+    laplacian(u, dudt, work3D)
+u = field_t(test3Dmesh, lambda xx: f2D(xx) * np.cos(k * xx[2]))
+for integrator in (forward_euler_t(rhs3D, u), ssp_rk3_t(rhs3D, u), low_storage_rk4_t(rhs3D, u)):
+    t1 = time.process_time()
+    integrator.step(0.0, 1e-6, u)
+    t2 = time.process_time()
+    print(type(integrator).__name__ + " 3D step time: ", t2 - t1, "s")
@@ -0,0 +1,298 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+import math
+import sys
+sys.path.append('../')
+from fields import field_expression
+from time_integration.runge_kutta import explicit_integrator_t, state_values
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Splits values into flat arrays: the values themselves if they are flat,
+# otherwise their rows along the last axis (structured values of fields with
+# ghost layers)
+def flat_pieces(values):
+    if values.ndim == 1:
+        return [values]
+    return [piece for sub in values for piece in flat_pieces(sub)]
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Maximum absolute value of an array in a single pass, chunk by chunk
+# through a small buffer (no full-size |values| temporary); NaN if any value
+# is NaN
+def max_abs(values, buffer = None):
+    chunk_size = field_expression.chunk_size
+    if buffer is None:
+        buffer = np.empty(min(chunk_size, values.size), dtype=values.dtype)
+    result = 0.0
+    for piece in flat_pieces(values):
+        for start in range(0, piece.shape[0], chunk_size):
+            stop  = min(start + chunk_size, piece.shape[0])
+            chunk = np.absolute(piece[start:stop], out=buffer[:stop - start])
+            chunk_max = chunk.max()
+            if np.isnan(chunk_max):
+                return math.nan
+            result = max(result, chunk_max)
+    return float(result)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Whether two arrays hold the same values, compared chunk by chunk (no
+# full-size boolean temporary)
+def same_values(a, b):
+    chunk_size = field_expression.chunk_size
+    for (a_i, b_i) in zip(flat_pieces(a), flat_pieces(b)):
+        for start in range(0, a_i.shape[0], chunk_size):
+            stop = min(start + chunk_size, a_i.shape[0])
+            if not np.array_equal(a_i[start:stop], b_i[start:stop]):
+                return False
+    return True
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Computes the largest stable time step of an explicit scheme from the face
+# velocities (one face field per orientation, normal components) and the
+# viscosity: the convective limit cfl / sum(max|u_i| / dx_i) and the
+# diffusive limit diffusion_number / (viscosity * sum(1 / dx_i^2)). Only one
+# pass over each velocity field is made. Returns None if the velocities are
+# not finite.
+def stable_time_step(velocities, cfl = 0.5, viscosity = 0.0, diffusion_number = 0.25, \
+                     max_dt = np.inf):
+    mesh = velocities[0].mesh
+    buffer = np.empty(field_expression.chunk_size, dtype=velocities[0].dtype)
+    rate = 0.0
+    for i in range(mesh.num_dims):
+        rate += max_abs(velocities[i].values, buffer) / mesh.cell_size[i]
+    if not math.isfinite(rate):
+        print("ERROR: non-finite velocities, no stable time step")
+        return None
+    dt = max_dt
+    if rate > 0.0:
+        dt = min(dt, cfl / rate)
+    if viscosity > 0.0:
+        dt = min(dt, diffusion_number / (viscosity * sum([1.0 / dx ** 2 for dx in mesh.cell_size])))
+    return dt
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Root mean square of err / (atol + rtol * max(|u0|, |u|)) over lists of
+# arrays, evaluated chunk by chunk through two small buffers
+def error_norm(errors, initial, final, atol, rtol):
+    chunk_size = field_expression.chunk_size
+    total = 0.0
+    count = 0
+    scale = np.empty(min(chunk_size, max(e.size for e in errors)), dtype=errors[0].dtype)
+    work  = np.empty_like(scale)
+    for (e, u0, u) in zip(errors, initial, final):
+        for (e_i, u0_i, u_i) in zip(flat_pieces(e), flat_pieces(u0), flat_pieces(u)):
+            size = e_i.shape[0]
+            for start in range(0, size, chunk_size):
+                stop = min(start + chunk_size, size)
+                s = scale[:stop - start]
+                w = work[:stop - start]
+                np.absolute(u0_i[start:stop], out=s)
+                np.absolute(u_i[start:stop], out=w)
+                np.maximum(s, w, out=s)
+                np.multiply(s, rtol, out=s)
+                np.add(s, atol, out=s)
+                np.divide(e_i[start:stop], s, out=w)
+                total += np.dot(w, w)
+            count += size
+    return math.sqrt(total / count)
+
+# Bogacki-Shampine 3(2) tableau (the last stage is the derivative at the new
+# state, reused as the first stage of the next step)
+bogacki_shampine_a = ((), (0.5,), (0.0, 0.75), (2.0 / 9.0, 1.0 / 3.0, 4.0 / 9.0))
+bogacki_shampine_c = (0.0, 0.5, 0.75, 1.0)
+bogacki_shampine_e = (-5.0 / 72.0, 1.0 / 12.0, 1.0 / 9.0, -1.0 / 8.0)
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class bogacki_shampine_t(explicit_integrator_t):
+    """Adaptive Bogacki-Shampine 3(2) embedded Runge-Kutta method, with error
+    control and optional stability limit on the step (five registers: initial
+    state and four stage derivatives)."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor
+    #   - atol, rtol: absolute and relative tolerances of the local error
+    #   - safety, min_factor, max_factor: step size controller parameters
+    #   - min_dt, max_rejections: a step fails (with an error) once its size
+    #     falls below min_dt or after max_rejections consecutive rejections
+    def __init__(self, rhs, state, atol = 1e-6, rtol = 1e-6, safety = 0.9, \
+                 min_factor = 0.2, max_factor = 5.0, min_dt = 0.0, max_rejections = 50):
+        super().__init__(rhs, state, 5)
+        self.atol       = atol
+        self.rtol       = rtol
+        self.safety     = safety
+        self.min_factor = min_factor
+        self.max_factor = max_factor
+        self.min_dt     = min_dt
+        self.max_rejections = max_rejections
+        self.first_stage_valid = False
+        self.first_stage_time  = None
+        self.num_accepted = 0
+        self.num_rejected = 0
+        self.last_error   = 0.0
+        self.dt_history   = []
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Attempts a step from t to t + dt, advancing u in place, and returns the
+    # error norm (the step is acceptable if it is at most 1). The derivative at
+    # u is taken from the previous step only if u still holds the state that
+    # step accepted (kept in the first register) at the same time t.
+    def try_step(self, t, dt, u):
+        u_values  = state_values(u)
+        u0_values = self.register_values[0]
+        k_values  = self.register_values[1:]
+        if self.first_stage_valid and t == self.first_stage_time:
+            self.first_stage_valid = all([same_values(u_i, u0_i) \
+                                          for (u_i, u0_i) in zip(u_values, u0_values)])
+        else:
+            self.first_stage_valid = False
+        if not self.first_stage_valid:
+            for (u_i, u0_i) in zip(u_values, u0_values):
+                u0_i[...] = u_i
+            self.rhs(t, u, self.registers[1])
+            self.first_stage_valid = True
+            self.first_stage_time  = t
+        for s in range(1, 4):
+            # u = u0 + dt sum(a k) (the last derivative register as temporary)
+            a = bogacki_shampine_a[s]
+            for i in range(len(u_values)):
+                u_values[i][...] = u0_values[i]
+                for j in range(len(a)):
+                    if a[j] != 0.0:
+                        np.multiply(k_values[j][i], dt * a[j], out=k_values[3][i])
+                        np.add(u_values[i], k_values[3][i], out=u_values[i])
+            self.rhs(t + bogacki_shampine_c[s] * dt, u, self.registers[1 + s])
+        # Error estimate dt sum(e k), accumulated into the second derivative
+        # register (the third one as temporary, the first and last are kept)
+        e = bogacki_shampine_e
+        for i in range(len(u_values)):
+            (k0, k1, k2, k3) = [k[i] for k in k_values]
+            np.multiply(k1, dt * e[1], out=k1)
+            np.multiply(k2, dt * e[2], out=k2)
+            np.add(k1, k2, out=k1)
+            np.multiply(k0, dt * e[0], out=k2)
+            np.add(k1, k2, out=k1)
+            np.multiply(k3, dt * e[3], out=k2)
+            np.add(k1, k2, out=k1)
+        return error_norm(k_values[1], u0_values, u_values, self.atol, self.rtol)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Accepts the last attempted step, ending at time t with state u: its last
+    # derivative becomes the first one of the next step, and u is kept to
+    # check that the next step starts from it
+    def accept(self, t, u):
+        (self.registers[1], self.registers[4]) = (self.registers[4], self.registers[1])
+        (self.register_values[1], self.register_values[4]) = \
+            (self.register_values[4], self.register_values[1])
+        for (u_i, u0_i) in zip(state_values(u), self.register_values[0]):
+            u0_i[...] = u_i
+        self.first_stage_time = t
+        self.num_accepted += 1
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Rejects the last attempted step, restoring u
+    def reject(self, u):
+        for (u_i, u0_i) in zip(state_values(u), self.register_values[0]):
+            u_i[...] = u0_i
+        self.num_rejected += 1
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Returns the next step size from the error norm of the last attempt
+    # (error of order 3; non-finite errors shrink the step the most)
+    def next_dt(self, dt, error):
+        if not math.isfinite(error):
+            return dt * self.min_factor
+        if error == 0.0:
+            return dt * self.max_factor
+        factor = self.safety * error ** (-1.0 / 3.0)
+        return dt * min(self.max_factor, max(self.min_factor, factor))
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Advances u (in place) from t to t + dt without error control (the error
+    # norm of the step is kept in last_error)
+    def step(self, t, dt, u):
+        self.last_error = self.try_step(t, dt, u)
+        self.accept(t + dt, u)
+        return t + dt
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Advances u (in place) by one accepted step from t, starting from the step
+    # size dt, and returns (new time, next step size). max_dt(t, u) (optional)
+    # limits the steps (for example through stable_time_step). Returns None,
+    # with u unchanged, if no step can be accepted (non-finite errors count
+    # as rejections).
+    def adaptive_step(self, t, dt, u, max_dt = None):
+        dt = self.limit_dt(t, dt, u, max_dt)
+        if dt is None:
+            return None
+        for r in range(self.max_rejections):
+            if dt < self.min_dt or not dt > 0.0:
+                print("ERROR: step size ", dt, " below the minimum ", self.min_dt, " at t = ", t)
+                return None
+            error = self.try_step(t, dt, u)
+            if error <= 1.0:
+                self.accept(t + dt, u)
+                return (t + dt, self.next_dt(dt, error))
+            self.reject(u)
+            dt = self.next_dt(dt, error)
+        print("ERROR: ", self.max_rejections, " consecutive rejected steps at t = ", t)
+        return None
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Limits the step size through max_dt(t, u), if given (None on error)
+    def limit_dt(self, t, dt, u, max_dt):
+        if max_dt is None:
+            return dt
+        limit = max_dt(t, u)
+        if limit is None:
+            print("ERROR: no step size limit at t = ", t)
+            return None
+        return min(dt, limit)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Advances u (in place) from t to t_end with adaptive steps (starting from
+    # dt), returning the final time (None if a step fails, u holding the last
+    # accepted state); the accepted step sizes are recorded in dt_history
+    def integrate(self, t, t_end, dt, u, max_dt = None):
+        self.first_stage_valid = False
+        self.dt_history = []
+        while t < t_end:
+            dt = self.limit_dt(t, dt, u, max_dt)
+            if dt is None:
+                return None
+            last = t + dt >= t_end
+            if last:
+                dt = t_end - t
+            result = self.adaptive_step(t, dt, u)
+            if result is None:
+                return None
+            (t_new, dt_next) = result
+            self.dt_history.append(t_new - t)
+            if last and t_new - t == dt:
+                return t_end
+            (t, dt) = (t_new, dt_next)
+        return t
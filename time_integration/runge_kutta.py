@@ -0,0 +1,212 @@
+#	MIT License
+#
+#	Copyright (c) 2023 Tommaso-Zanelli
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a copy
+#	of this software and associated documentation files (the "Software"), to deal
+#	in the Software without restriction, including without limitation the rights
+#	to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#	copies of the Software, and to permit persons to whom the Software is
+#	furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in all
+#	copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#	OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#	SOFTWARE.
+#
+#
+# --------------------------------------------------------------------------- #
+# Modules
+import numpy as np
+import math
+import sys
+sys.path.append('../')
+from fields.field import field_t
+
+# The state of an integrator is a field or a list (tuple) of fields. The
+# right hand side is a function rhs(t, u, dudt) filling dudt (same structure as
+# u) in place with the time derivative of u at time t.
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Returns the value arrays of a state (flat, or structured for fields with
+# ghost layers)
+def state_values(state):
+    if isinstance(state, field_t):
+        return [state.values]
+    return [field.values for field in state]
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Allocates a register with the structure of a state (fields sharing the
+# boundary conditions of the state fields, with ghost layers if they have any,
+# so that their values have the same shape)
+def allocate_register(state):
+    if not isinstance(state, field_t):
+        return [allocate_register(field) for field in state]
+    if state.padded is not None:
+        return field_t(state.mesh, 0.0, state.num_directions, state.orientation, state.dtype, \
+                       state.halo_width, state.boundary_conditions)
+    return state.wrap(np.empty_like(state.values))
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class explicit_integrator_t:
+    """Base class of the explicit integrators: registers with the structure of
+    the state, allocated once, and time loop."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor: state is only used as a template for the registers
+    def __init__(self, rhs, state, num_registers):
+        self.rhs = rhs
+        self.registers = [allocate_register(state) for i in range(num_registers)]
+        self.register_values = [state_values(register) for register in self.registers]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Advances u (in place) from t to t + dt, returning the new time
+    def step(self, t, dt, u):
+        print("ERROR: step is not implemented by ", type(self).__name__)
+        return None
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Advances u (in place) from t to t_end with steps of dt (the last one
+    # shortened to reach t_end), returning the final time (None on error)
+    def integrate(self, t, t_end, dt, u):
+        if not (math.isfinite(dt) and dt > 0.0):
+            print("ERROR: the time step must be positive and finite (dt = ", dt, ")")
+            return None
+        while t < t_end:
+            if t + dt >= t_end:
+                if self.step(t, t_end - t, u) is None:
+                    return None
+                return t_end
+            t = self.step(t, dt, u)
+            if t is None:
+                return None
+        return t
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class forward_euler_t(explicit_integrator_t):
+    """Forward Euler method (one register)."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor
+    def __init__(self, rhs, state):
+        super().__init__(rhs, state, 1)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Advances u (in place) from t to t + dt
+    def step(self, t, dt, u):
+        k = self.registers[0]
+        self.rhs(t, u, k)
+        for (u_i, k_i) in zip(state_values(u), self.register_values[0]):
+            np.multiply(k_i, dt, out=k_i)
+            np.add(u_i, k_i, out=u_i)
+        return t + dt
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class ssp_rk3_t(explicit_integrator_t):
+    """Third order strong stability preserving Runge-Kutta method (Shu-Osher
+    form, two registers: initial state and stage derivative)."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor
+    def __init__(self, rhs, state):
+        super().__init__(rhs, state, 2)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Advances u (in place) from t to t + dt:
+    #   u1 = u0 + dt L(u0)
+    #   u2 = 3/4 u0 + 1/4 (u1 + dt L(u1))
+    #   u  = 1/3 u0 + 2/3 (u2 + dt L(u2))
+    def step(self, t, dt, u):
+        (u0, k) = self.registers
+        u_values = state_values(u)
+        for (u_i, u0_i) in zip(u_values, self.register_values[0]):
+            u0_i[...] = u_i
+        stages = ((0.0, 1.0), (1.0, 0.25), (0.5, 2.0 / 3.0))
+        for (c, weight) in stages:
+            self.rhs(t + c * dt, u, k)
+            for (u_i, u0_i, k_i) in zip(u_values, self.register_values[0], self.register_values[1]):
+                # u = (1 - weight) u0 + weight (u + dt k)
+                np.multiply(k_i, dt, out=k_i)
+                np.add(u_i, k_i, out=u_i)
+                if weight != 1.0:
+                    np.multiply(u_i, weight, out=u_i)
+                    np.multiply(u0_i, 1.0 - weight, out=k_i)
+                    np.add(u_i, k_i, out=u_i)
+        return t + dt
+
+# Williamson low-storage coefficients of the five-stage fourth order method of
+# Carpenter and Kennedy (1994)
+low_storage_rk4_a = (0.0, \
+                     -567301805773.0 / 1357537059087.0, \
+                     -2404267990393.0 / 2016746695238.0, \
+                     -3550918686646.0 / 2091501179385.0, \
+                     -1275806237668.0 / 842570457699.0)
+low_storage_rk4_b = (1432997174477.0 / 9575080441755.0, \
+                     5161836677717.0 / 13612068292357.0, \
+                     1720146321549.0 / 2090206949498.0, \
+                     3134564353537.0 / 4481467310338.0, \
+                     2277821191437.0 / 14882151754819.0)
+low_storage_rk4_c = (0.0, \
+                     1432997174477.0 / 9575080441755.0, \
+                     2526269341429.0 / 6820363962896.0, \
+                     2006345519317.0 / 3224310063776.0, \
+                     2802321613138.0 / 2924317926251.0)
+
+# --------------------------------------------------------------------------- #
+# Class definition
+class low_storage_rk4_t(explicit_integrator_t):
+    """Fourth order Williamson (2N) low-storage Runge-Kutta method: for each
+    stage du = a du + dt L(u), u = u + b du.
+    With accumulate = True the right hand side adds the derivative to dudt
+    (dudt += L(u)) and only the du register is stored; otherwise a second
+    register receives L(u)."""
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Constructor
+    def __init__(self, rhs, state, accumulate = False):
+        self.accumulate = accumulate
+        super().__init__(rhs, state, 1 if accumulate else 2)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    # Advances u (in place) from t to t + dt. The register holds b du of the
+    # previous stage, so that the next stage scales it by a / b (no extra
+    # register is needed for the update of u).
+    def step(self, t, dt, u):
+        u_values  = state_values(u)
+        du_values = self.register_values[0]
+        for s in range(len(low_storage_rk4_a)):
+            scale = 0.0 if s == 0 else low_storage_rk4_a[s] / low_storage_rk4_b[s - 1]
+            b     = low_storage_rk4_b[s]
+            t_s   = t + low_storage_rk4_c[s] * dt
+            if self.accumulate:
+                # du = dt (a du / dt + L(u))
+                for du_i in du_values:
+                    if s == 0:
+                        du_i[...] = 0.0
+                    else:
+                        np.multiply(du_i, scale / dt, out=du_i)
+                self.rhs(t_s, u, self.registers[0])
+                for du_i in du_values:
+                    np.multiply(du_i, dt * b, out=du_i)
+            else:
+                self.rhs(t_s, u, self.registers[1])
+                for (du_i, k_i) in zip(du_values, self.register_values[1]):
+                    if s == 0:
+                        np.multiply(k_i, dt * b, out=du_i)
+                        continue
+                    np.multiply(du_i, scale, out=du_i)
+                    np.multiply(k_i, dt, out=k_i)
+                    np.add(du_i, k_i, out=du_i)
+                    np.multiply(du_i, b, out=du_i)
+            for (u_i, du_i) in zip(u_values, du_values):
+                np.add(u_i, du_i, out=u_i)
+        return t + dt
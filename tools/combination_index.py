@@ -21,7 +21,36 @@
 #	SOFTWARE.
 #
 #
-from math import comb
+from itertools import combinations
+
+# Cached lookup tables, keyed by (num_dimensions, num_directions)
+combination_tables = {}
+
+def combination_table(num_dimensions, num_directions):
+    """
+    Returns the (cached) lookup tables of the combinations of directions.
+
+    Parameters
+    ----------
+    num_dimensions : integer
+        The total number of dimensions.
+    num_directions : integer
+        The number of directions considered for combinations.
+
+    Returns
+    -------
+    (indices, directions, lookup) : tuple
+        indices    : tuple of all combination indices, in order.
+        directions : tuple of the corresponding (sorted) direction tuples.
+        lookup     : dictionary mapping each direction tuple to its index.
+    """
+    key = (num_dimensions, num_directions)
+    if key not in combination_tables:
+        directions = tuple(combinations(range(num_dimensions), num_directions))
+        indices    = tuple(range(len(directions)))
+        lookup     = dict(zip(directions, indices))
+        combination_tables[key] = (indices, directions, lookup)
+    return combination_tables[key]
 
 def combination_index(num_dimensions, num_directions, combination = None):
     """
@@ -40,38 +69,14 @@ def combination_index(num_dimensions, num_directions, combination = None):
     if num_directions > num_dimensions:
             print("ERROR: number of directions cannot be greater than the number of dimensions!")
             return None
+    (indices, directions, lookup) = combination_table(num_dimensions, num_directions)
     if type(combination) is tuple:
-        directions_list = list(combination)
-        directions_list.sort()
-        if len(directions_list) != num_directions:
+        if len(combination) != num_directions:
             print("ERROR: inconsistent number of directions!")
             return None
+        return lookup.get(tuple(sorted(combination)))
     elif combination is None:
-        global_index_list = []
-        dir_indexes_list  = []
-    num_combinations = comb(num_dimensions, num_directions)
-    global_index = 0
-    dir_indexes  = list(range((num_directions - 1), -1, -1))
-    current_dir = 0
-    while current_dir < num_directions:
-        if type(combination) is tuple:
-            if directions_list == dir_indexes[::-1]: return global_index
-        elif type(combination) is int:
-            if combination == global_index: return tuple(dir_indexes[::-1])
-        elif combination is None:
-                global_index_list.append(global_index)
-                dir_indexes_list.append(tuple(dir_indexes[::-1]))
-        validIncrease = False
-        while (not validIncrease) and (current_dir < num_directions):
-            dir_indexes[current_dir]+=1
-            for subsequentDirs in range(current_dir-1, -1, -1):
-                dir_indexes[subsequentDirs] = dir_indexes[subsequentDirs + 1] + 1
-            if any(value >= num_dimensions for value in dir_indexes):
-                current_dir += 1
-            else:
-                current_dir = 0
-                validIncrease = True
-        global_index += 1
-    if combination is None:
-        return (tuple(global_index_list), tuple(dir_indexes_list))
+        return (indices, directions)
+    if 0 <= combination < len(directions):
+        return directions[combination]
     return None